@@ -1,7 +1,7 @@
 from datetime import UTC, datetime
 
 from dependencies import get_db_client  # Import the new dependency
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, BackgroundTasks, Depends, status
 from pydantic import BaseModel
 
 router = APIRouter(tags=["Analytics"])
@@ -14,7 +14,9 @@ class AnalyticsEvent(BaseModel):
 
 
 @router.post("/api/analytics", status_code=status.HTTP_202_ACCEPTED)
-async def create_analytics(event: AnalyticsEvent, db=Depends(get_db_client)):
+def create_analytics(
+    event: AnalyticsEvent, background_tasks: BackgroundTasks, db=Depends(get_db_client)
+):
     analytics_collection = db.analytics
     analytics_entry = {
         "user_id": event.user_id,
@@ -22,5 +24,6 @@ async def create_analytics(event: AnalyticsEvent, db=Depends(get_db_client)):
         "details": event.details,
         "timestamp": datetime.now(UTC),
     }
-    analytics_collection.insert_one(analytics_entry)
+    # The event is only acknowledged (202), so write it after the response is sent
+    background_tasks.add_task(analytics_collection.insert_one, analytics_entry)
     return {"message": "Event logged."}
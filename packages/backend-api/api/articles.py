@@ -2,11 +2,40 @@ import uuid
 from datetime import UTC, datetime
 
 from dependencies import get_db_client
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel, HttpUrl
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from pydantic import BaseModel, Field, HttpUrl
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from shared.articles import article_summary_projection, derive_source
 
 router = APIRouter(tags=["Articles"])
 
+# Most articles accepted by a single batch create request
+ARTICLE_BATCH_MAX_SIZE = 100
+
+# MongoDB duplicate key error code, raised when a unique index rejects an insert
+DUPLICATE_KEY_ERROR = 11000
+
+# Duplicate checks only need the existing article's id (falling back to _id), not
+# the stored summary and crawled content
+EXISTING_ARTICLE_FIELDS = {"id": 1}
+
+
+class ArticleSummary(BaseModel):
+    """Article shape returned by list endpoints, mapped to frontend field names."""
+
+    id: str
+    title: str | None = None
+    description: str | None = None
+    url: str | None = None
+    published_at: str | None = None
+    source: str
+    feed_id: str | None = None
+    feed_name: str | None = None
+
+
+class ArticleListResponse(BaseModel):
+    data: list[ArticleSummary]
+
 
 class ArticleCreate(BaseModel):
     title: str
@@ -20,25 +49,15 @@ class ArticleCreate(BaseModel):
     feed_name: str | None = None  # RSS feed name for display
 
 
-@router.post("/api/articles", status_code=status.HTTP_201_CREATED)
-async def create_article(article: ArticleCreate, db=Depends(get_db_client)):
-    """Create a new article. Used by Azure Functions for scraped content."""
-    from pymongo.errors import DuplicateKeyError
+class ArticleBatchCreate(BaseModel):
+    articles: list[ArticleCreate] = Field(max_length=ARTICLE_BATCH_MAX_SIZE)
 
-    articles_collection = db.articles
 
-    # Check for duplicates - check both 'link' and 'url' fields for compatibility
+def _new_article_document(article: ArticleCreate, now: datetime) -> dict:
+    """Build the stored document for a newly scraped article."""
     article_url = str(article.link)
-    existing = articles_collection.find_one({"$or": [{"link": article_url}, {"url": article_url}]})
-    if existing:
-        return {
-            "message": "Article already exists.",
-            "id": existing.get("id", str(existing.get("_id"))),
-        }
-
-    article_id = str(uuid.uuid4())
-    new_article = {
-        "id": article_id,
+    return {
+        "id": str(uuid.uuid4()),
         "title": article.title,
         "link": article_url,
         "url": article_url,  # Add url field for compatibility with unique index
@@ -50,14 +69,53 @@ async def create_article(article: ArticleCreate, db=Depends(get_db_client)):
         "feed_id": article.feed_id,
         "feed_name": article.feed_name,
         "processed": False,
-        "created_at": datetime.now(UTC),
+        "created_at": now,
     }
 
+
+def _article_scraped_event(new_article: dict, now: datetime) -> dict:
+    """Build the analytics event logged for a created article."""
+    return {
+        "user_id": "system",
+        "event_type": "article_scraped",
+        "details": {
+            "article_id": new_article["id"],
+            "source": new_article["source"],
+            "tags": new_article["tags"],
+        },
+        "timestamp": now,
+    }
+
+
+@router.post("/api/articles", status_code=status.HTTP_201_CREATED)
+def create_article(
+    article: ArticleCreate, background_tasks: BackgroundTasks, db=Depends(get_db_client)
+):
+    """Create a new article. Used by Azure Functions for scraped content."""
+    articles_collection = db.articles
+
+    # Check for duplicates - check both 'link' and 'url' fields for compatibility
+    article_url = str(article.link)
+    existing = articles_collection.find_one(
+        {"$or": [{"link": article_url}, {"url": article_url}]}, EXISTING_ARTICLE_FIELDS
+    )
+    if existing:
+        return {
+            "message": "Article already exists.",
+            "id": existing.get("id", str(existing.get("_id"))),
+        }
+
+    now = datetime.now(UTC)
+    new_article = _new_article_document(article, now)
+    article_id = new_article["id"]
+
     try:
         articles_collection.insert_one(new_article)
     except DuplicateKeyError:
         # Handle race condition where article was inserted between check and insert
-        existing = articles_collection.find_one({"$or": [{"link": article_url}, {"url": article_url}]})
+        existing = articles_collection.find_one(
+            {"$or": [{"link": article_url}, {"url": article_url}]}, EXISTING_ARTICLE_FIELDS
+        )
         if existing:
             return {
                 "message": "Article already exists.",
@@ -66,60 +124,89 @@ async def create_article(article: ArticleCreate, db=Depends(get_db_client)):
         # If we still can't find it, re-raise the error
         raise
 
-    # Log analytics event for article creation
+    # Log analytics event for article creation after the response is sent
     analytics_collection = db.analytics
-    analytics_collection.insert_one(
-        {
-            "user_id": "system",
-            "event_type": "article_scraped",
-            "details": {"article_id": article_id, "source": article.source, "tags": article.tags},
-            "timestamp": datetime.now(UTC),
-        }
+    background_tasks.add_task(
+        analytics_collection.insert_one, _article_scraped_event(new_article, now)
     )
 
     return {"message": "Article created successfully.", "id": article_id}
 
 
-@router.get("/api/articles", status_code=status.HTTP_200_OK)
-async def get_articles(db=Depends(get_db_client)):
+@router.post("/api/articles/batch", status_code=status.HTTP_201_CREATED)
+def create_articles(
+    batch: ArticleBatchCreate, background_tasks: BackgroundTasks, db=Depends(get_db_client)
+):
+    """Create many articles in one request. Used by Azure Functions for RSS ingestion.
+
+    Articles whose link is already stored, or repeated within the batch, are skipped.
+    """
+    articles_collection = db.articles
+    now = datetime.now(UTC)
+
+    # One duplicate check for the whole batch instead of one per article
+    article_urls = [str(article.link) for article in batch.articles]
+    existing_urls = set()
+    for existing in articles_collection.find(
+        {"$or": [{"link": {"$in": article_urls}}, {"url": {"$in": article_urls}}]},
+        {"_id": 0, "link": 1, "url": 1},
+    ):
+        existing_urls.update(filter(None, (existing.get("link"), existing.get("url"))))
+
+    new_articles = []
+    for article in batch.articles:
+        new_article = _new_article_document(article, now)
+        if new_article["link"] in existing_urls:
+            continue
+        existing_urls.add(new_article["link"])
+        new_articles.append(new_article)
+
+    if new_articles:
+        try:
+            articles_collection.insert_many(new_articles, ordered=False)
+        except BulkWriteError as e:
+            # Articles inserted concurrently since the check above are skipped like
+            # any other existing article; anything else is a real failure
+            write_errors = e.details.get("writeErrors", [])
+            if any(error.get("code") != DUPLICATE_KEY_ERROR for error in write_errors):
+                raise
+            rejected = {error["index"] for error in write_errors}
+            new_articles = [a for i, a in enumerate(new_articles) if i not in rejected]
+
+    if new_articles:
+        analytics_collection = db.analytics
+        background_tasks.add_task(
+            analytics_collection.insert_many,
+            [_article_scraped_event(new_article, now) for new_article in new_articles],
+        )
+
+    return {
+        "message": "Articles processed.",
+        "created": len(new_articles),
+        "ids": [new_article["id"] for new_article in new_articles],
+    }
+
+
+@router.get("/api/articles", status_code=status.HTTP_200_OK, response_model=ArticleListResponse)
+def get_articles(db=Depends(get_db_client)):
     articles_collection = db.articles
-    articles = list(articles_collection.find({}, {"_id": 0}))
+    # Summaries come back already mapped to frontend field names
+    # (summary -> description, link -> url, published -> published_at)
+    articles = list(
+        articles_collection.aggregate([{"$project": {"_id": 0, **article_summary_projection()}}])
+    )
 
-    # Transform to match frontend expectations
-    transformed = []
     for article in articles:
+        if not article.get("id"):
+            article["id"] = str(uuid.uuid4())  # Generate ID if missing
         # Extract source from URL domain if not provided
-        source = article.get("source")
-        if not source or source == "rss":
-            # Extract domain from URL
-            link = article.get("link", "")
-            if link:
-                from urllib.parse import urlparse
-
-                domain = urlparse(link).netloc
-                # Remove www. and get the main domain
-                source = domain.replace("www.", "").split(".")[0].title() if domain else "RSS"
-            else:
-                source = "RSS"
-
-        transformed.append(
-            {
-                "id": article.get("id") or str(uuid.uuid4()),  # Generate ID if missing
-                "title": article.get("title"),
-                "description": article.get("summary"),  # Map summary to description
-                "url": article.get("link"),  # Map link to url
-                "published_at": article.get("published"),  # Map published to published_at
-                "source": source,
-                "feed_id": article.get("feed_id"),
-                "feed_name": article.get("feed_name"),
-            }
-        )
+        article["source"] = derive_source(article)
 
-    return {"data": transformed}
+    return {"data": articles}
 
 
 @router.get("/api/articles/{article_id}", status_code=status.HTTP_200_OK)
-async def get_article(article_id: str, db=Depends(get_db_client)):
+def get_article(article_id: str, db=Depends(get_db_client)):
     articles_collection = db.articles
     article = articles_collection.find_one({"id": article_id}, {"_id": 0})
     if not article:
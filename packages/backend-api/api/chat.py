@@ -1,17 +1,60 @@
+import json
 import uuid
 import logging
 from datetime import UTC, datetime
 
-from google import genai
+import orjson
 from google.genai import types
-from dependencies import get_db_client, get_gemini_api_key
-from fastapi import APIRouter, Depends, HTTPException, status
+from dependencies import get_db_client, get_gemini_api_key, get_genai_client
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from shared.cache import SingleFlight, TTLCache, normalize_prompt
 
 router = APIRouter(tags=["Chat"])
 logger = logging.getLogger(__name__)
 
 
+# System instruction for UP2D8 assistant. Kept at module level and free of
+# per-request values so every call sends a byte-identical prefix, which lets
+# Gemini's implicit prompt caching reuse it across requests.
+CHAT_SYSTEM_INSTRUCTION = """
+You are UP2D8, an AI assistant for a personal news digest and information management platform.
+
+Your role:
+- Help users stay updated with accurate, recent information using Google Search grounding.
+- Summarize clearly and concisely.
+- Maintain a professional, helpful, and neutral tone.
+- Use the most current information available from your search results.
+- Avoid speculation or filler.
+
+IMPORTANT Response format:
+- Provide a direct, concise answer or summary.
+- DO NOT include "Sources:" or list URLs in your response.
+- DO NOT mention where the information came from.
+- The UI will automatically display sources separately.
+- Just give the answer naturally as if you know it directly.
+"""
+
+# Google Search grounding config, built once and shared by every request
+CHAT_CONFIG = types.GenerateContentConfig(
+    system_instruction=CHAT_SYSTEM_INSTRUCTION,
+    tools=[types.Tool(google_search=types.GoogleSearch())],
+)
+
+# Repeated questions ("what's the latest on X") are answered from here. The TTL
+# is short because replies are grounded in live search results.
+_chat_response_cache = TTLCache(ttl=600)
+_chat_inflight = SingleFlight()
+
+
+def _ndjson_event(event: dict) -> bytes:
+    """Encode one stream event as a newline-terminated JSON line."""
+    # orjson writes UTF-8 bytes directly, skipping json.dumps' str building and
+    # the re-encode on the way out; this runs once per streamed chunk
+    return orjson.dumps(event, option=orjson.OPT_APPEND_NEWLINE)
+
+
 class ChatRequest(BaseModel):
     prompt: str
 
@@ -25,111 +68,160 @@ class MessageContent(BaseModel):
     content: str
 
 
+def _extract_sources(response) -> list[dict]:
+    """Pull web sources out of a Gemini response's grounding metadata."""
+    sources = []
+
+    # Extract grounding metadata from first candidate (standard structure). Callers
+    # log the resulting count once per reply; per-source detail is debug-only.
+    try:
+        if response.candidates and len(response.candidates) > 0:
+            candidate = response.candidates[0]
+
+            if hasattr(candidate, 'grounding_metadata') and candidate.grounding_metadata:
+                metadata = candidate.grounding_metadata
+
+                # Extract sources from grounding_chunks (the main source list)
+                if hasattr(metadata, 'grounding_chunks') and metadata.grounding_chunks:
+                    for chunk in metadata.grounding_chunks:
+                        if hasattr(chunk, 'web') and chunk.web:
+                            web_source = {
+                                "uri": chunk.web.uri,
+                                "title": getattr(chunk.web, 'title', chunk.web.uri)
+                            }
+                            sources.append({"web": web_source})
+                else:
+                    logger.debug("No grounding_chunks in grounding_metadata")
+            else:
+                logger.debug("No grounding_metadata in candidate")
+        else:
+            logger.debug("No candidates in response")
+    except Exception as e:
+        logger.error(f"Error extracting sources: {e}", exc_info=True)
+
+    if sources and logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Grounding sources: {[source['web']['title'] for source in sources]}")
+
+    return sources
+
+
 @router.post("/api/chat", status_code=status.HTTP_200_OK)
 async def chat(request: ChatRequest, api_key: str = Depends(get_gemini_api_key)):
     """
     Send a chat message to the AI assistant with Google Search grounding.
     The AI will search the web for current information when needed.
     """
-    try:
-        # Initialize the new google-genai client
-        client = genai.Client(api_key=api_key)
-
-        # System instruction for UP2D8 assistant
-        system_instruction = """
-        You are UP2D8, an AI assistant for a personal news digest and information management platform.
-
-        Your role:
-        - Help users stay updated with accurate, recent information using Google Search grounding.
-        - Summarize clearly and concisely.
-        - Maintain a professional, helpful, and neutral tone.
-        - Use the most current information available from your search results.
-        - Avoid speculation or filler.
-
-        IMPORTANT Response format:
-        - Provide a direct, concise answer or summary.
-        - DO NOT include "Sources:" or list URLs in your response.
-        - DO NOT mention where the information came from.
-        - The UI will automatically display sources separately.
-        - Just give the answer naturally as if you know it directly.
-        """
-
-        # Configure Google Search grounding tool
-        config = types.GenerateContentConfig(
-            system_instruction=system_instruction,
-            tools=[types.Tool(google_search=types.GoogleSearch())]
-        )
+    cache_key = normalize_prompt(request.prompt)
+    cached_reply = _chat_response_cache.get(cache_key)
+    if cached_reply is not None:
+        return cached_reply
 
-        # Generate content with web search grounding
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=request.prompt,
-            config=config
+    try:
+        client = get_genai_client(api_key)
+
+        # Generate content with web search grounding. The async client keeps the
+        # event loop free, so concurrent chats overlap instead of queueing.
+        # A burst of the same question shares one Gemini call
+        response = await _chat_inflight.do(
+            cache_key,
+            lambda: client.aio.models.generate_content(
+                model="gemini-2.5-flash",
+                contents=request.prompt,
+                config=CHAT_CONFIG
+            ),
         )
 
-        # Extract sources from grounding metadata
-        sources = []
-
-        # Debug: Log the full response object as dict
-        try:
-            import json
-            response_dict = response.to_dict() if hasattr(response, 'to_dict') else {}
-            logger.info(f"Full response dict: {json.dumps(response_dict, indent=2, default=str)}")
-        except Exception as e:
-            logger.warning(f"Could not serialize response: {e}")
-            logger.info(f"Response type: {type(response)}")
-            logger.info(f"Response str: {str(response)}")
-
-        # Extract grounding metadata from first candidate (standard structure)
-        try:
-            if response.candidates and len(response.candidates) > 0:
-                candidate = response.candidates[0]
-
-                if hasattr(candidate, 'grounding_metadata') and candidate.grounding_metadata:
-                    metadata = candidate.grounding_metadata
-                    logger.info(f"✓ Found grounding_metadata")
-
-                    # Extract sources from grounding_chunks (the main source list)
-                    if hasattr(metadata, 'grounding_chunks') and metadata.grounding_chunks:
-                        logger.info(f"✓ Found {len(metadata.grounding_chunks)} grounding chunks")
-
-                        for chunk in metadata.grounding_chunks:
-                            if hasattr(chunk, 'web') and chunk.web:
-                                web_source = {
-                                    "uri": chunk.web.uri,
-                                    "title": getattr(chunk.web, 'title', chunk.web.uri)
-                                }
-                                sources.append({"web": web_source})
-                                logger.info(f"  - Added source: {web_source['title']}")
-                    else:
-                        logger.info("✗ No grounding_chunks found")
-
-                    # Also log search entry point if available
-                    if hasattr(metadata, 'search_entry_point') and metadata.search_entry_point:
-                        logger.info(f"✓ Search entry point available")
-                else:
-                    logger.info("✗ No grounding_metadata in candidate")
-            else:
-                logger.info("✗ No candidates in response")
-        except Exception as e:
-            logger.error(f"Error extracting sources: {e}", exc_info=True)
+        # Debug: Log the full response object as dict. Serializing the whole
+        # grounded response is expensive, so only do it when debug logging is on.
+        if logger.isEnabledFor(logging.DEBUG):
+            try:
+                response_dict = response.to_dict() if hasattr(response, 'to_dict') else {}
+                logger.debug(f"Full response dict: {json.dumps(response_dict, indent=2, default=str)}")
+            except Exception as e:
+                logger.debug(f"Could not serialize response ({type(response)}): {e}")
 
+        sources = _extract_sources(response)
         logger.info(f"Final sources count: {len(sources)}")
 
-        return {
+        reply = {
             "status": "success",
             "model": "gemini-2.5-flash",
             "reply": response.text.strip(),
             "sources": sources
         }
+        _chat_response_cache.set(cache_key, reply)
+        return reply
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Gemini API error: {e}"
         )
 
 
+@router.post("/api/chat/stream", status_code=status.HTTP_200_OK)
+async def chat_stream(request: ChatRequest, api_key: str = Depends(get_gemini_api_key)):
+    """
+    Streaming variant of /api/chat.
+    Emits newline-delimited JSON events as Gemini generates them: a "text" event per
+    chunk, then a final "sources" event once grounding metadata is available, so the
+    UI can render the answer from the first token instead of waiting for the full reply.
+    Completed replies share the /api/chat cache in both directions.
+    """
+    cache_key = normalize_prompt(request.prompt)
+    client = get_genai_client(api_key)
+
+    async def event_stream():
+        cached_reply = _chat_response_cache.get(cache_key)
+        if cached_reply is not None:
+            yield _ndjson_event({"type": "text", "text": cached_reply["reply"]})
+            yield _ndjson_event(
+                {"type": "sources", "model": cached_reply["model"], "sources": cached_reply["sources"]}
+            )
+            return
+
+        text_parts = []
+        sources = []
+        try:
+            stream = await client.aio.models.generate_content_stream(
+                model="gemini-2.5-flash",
+                contents=request.prompt,
+                config=CHAT_CONFIG,
+            )
+            async for chunk in stream:
+                if chunk.text:
+                    text_parts.append(chunk.text)
+                    yield _ndjson_event({"type": "text", "text": chunk.text})
+                # Grounding metadata only arrives on the final chunk(s)
+                if chunk.candidates and chunk.candidates[0].grounding_metadata:
+                    sources = _extract_sources(chunk)
+        except Exception as e:
+            logger.error(f"Gemini streaming error: {e}")
+            yield _ndjson_event({"type": "error", "detail": f"Gemini API error: {e}"})
+            return
+
+        logger.info(f"Final sources count: {len(sources)}")
+        yield _ndjson_event({"type": "sources", "model": "gemini-2.5-flash", "sources": sources})
+
+        # Store the assembled reply once the stream has closed
+        _chat_response_cache.set(
+            cache_key,
+            {
+                "status": "success",
+                "model": "gemini-2.5-flash",
+                "reply": "".join(text_parts).strip(),
+                "sources": sources,
+            },
+        )
+
+    # Keep proxies from buffering the stream so chunks reach the client as they arrive
+    return StreamingResponse(
+        event_stream(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/api/sessions", status_code=status.HTTP_200_OK)
-async def create_session(session_data: SessionCreate, db=Depends(get_db_client)):
+def create_session(session_data: SessionCreate, db=Depends(get_db_client)):
     sessions_collection = db.sessions
     session_id = str(uuid.uuid4())
     new_session = {
@@ -144,14 +236,15 @@ async def create_session(session_data: SessionCreate, db=Depends(get_db_client))
 
 
 @router.get("/api/users/{user_id}/sessions", status_code=status.HTTP_200_OK)
-async def get_sessions(user_id: str, db=Depends(get_db_client)):
+def get_sessions(user_id: str, db=Depends(get_db_client)):
     sessions_collection = db.sessions
-    sessions = list(sessions_collection.find({"user_id": user_id}, {"_id": 0}))
+    # Session listings only need metadata; message history is fetched per session
+    sessions = list(sessions_collection.find({"user_id": user_id}, {"_id": 0, "messages": 0}))
     return sessions
 
 
 @router.post("/api/sessions/{session_id}/messages", status_code=status.HTTP_200_OK)
-async def send_message(session_id: str, message_content: MessageContent, db=Depends(get_db_client)):
+def send_message(session_id: str, message_content: MessageContent, db=Depends(get_db_client)):
     sessions_collection = db.sessions
     result = sessions_collection.update_one(
         {"session_id": session_id},
@@ -171,9 +264,17 @@ async def send_message(session_id: str, message_content: MessageContent, db=Depe
 
 
 @router.get("/api/sessions/{session_id}/messages", status_code=status.HTTP_200_OK)
-async def get_messages(session_id: str, db=Depends(get_db_client)):
+def get_messages(
+    session_id: str,
+    limit: int | None = Query(None, ge=1, description="Return only the most recent N messages"),
+    db=Depends(get_db_client),
+):
     sessions_collection = db.sessions
-    session = sessions_collection.find_one({"session_id": session_id}, {"_id": 0, "messages": 1})
+    # $slice trims the embedded array server-side, so long sessions aren't read in full
+    messages_projection = {"$slice": -limit} if limit else 1
+    session = sessions_collection.find_one(
+        {"session_id": session_id}, {"_id": 0, "messages": messages_projection}
+    )
     if not session:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found.")
     return session.get("messages", [])
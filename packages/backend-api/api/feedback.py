@@ -14,7 +14,7 @@ class FeedbackCreate(BaseModel):
 
 
 @router.post("/api/feedback", status_code=status.HTTP_201_CREATED)
-async def create_feedback(feedback: FeedbackCreate, db=Depends(get_db_client)):
+def create_feedback(feedback: FeedbackCreate, db=Depends(get_db_client)):
     feedback_collection = db.feedback
     feedback_entry = {
         "message_id": feedback.message_id,
@@ -1,10 +1,34 @@
+import asyncio
 from datetime import UTC, datetime
 
 from dependencies import get_db_client
 from fastapi import APIRouter, Depends, status
+from shared.cache import TTLCache
 
 router = APIRouter(tags=["System"])
 
+# Total and unprocessed article counts in a single round-trip
+ARTICLE_COUNTS_PIPELINE = [
+    {
+        "$facet": {
+            "total": [{"$count": "count"}],
+            "unprocessed": [{"$match": {"processed": False}}, {"$count": "count"}],
+        }
+    }
+]
+
+# Collection counts are scans on Cosmos DB, while monitors poll this endpoint every
+# few seconds; the counts are reused for a minute, but the ping runs on every check
+_collection_stats_cache = TTLCache(ttl=60)
+
+
+def _count_articles(db) -> tuple[int, int]:
+    facets = next(db.articles.aggregate(ARTICLE_COUNTS_PIPELINE), {})
+    # $count emits nothing for an empty match, so a missing facet means zero
+    total = facets.get("total") or [{"count": 0}]
+    unprocessed = facets.get("unprocessed") or [{"count": 0}]
+    return total[0]["count"], unprocessed[0]["count"]
+
 
 @router.get("/api/health", status_code=status.HTTP_200_OK)
 async def health_check(db=Depends(get_db_client)):
@@ -14,23 +38,31 @@ async def health_check(db=Depends(get_db_client)):
     """
     try:
         # Test database connection
-        db.command("ping")
+        await asyncio.to_thread(db.command, "ping")
 
-        # Get collection stats
-        articles_count = db.articles.count_documents({})
-        users_count = db.users.count_documents({})
-        rss_feeds_count = db.rss_feeds.count_documents({})
-        unprocessed_articles = db.articles.count_documents({"processed": False})
+        collections = _collection_stats_cache.get("collections")
+        if collections is None:
+            # Get collection stats. The counts are independent, so run them
+            # concurrently instead of paying one database round-trip after another.
+            (articles_count, unprocessed_articles), users_count, rss_feeds_count = (
+                await asyncio.gather(
+                    asyncio.to_thread(_count_articles, db),
+                    asyncio.to_thread(db.users.count_documents, {}),
+                    asyncio.to_thread(db.rss_feeds.count_documents, {}),
+                )
+            )
+            collections = {
+                "articles": {"total": articles_count, "unprocessed": unprocessed_articles},
+                "users": users_count,
+                "rss_feeds": rss_feeds_count,
+            }
+            _collection_stats_cache.set("collections", collections)
 
         return {
             "status": "healthy",
             "timestamp": datetime.now(UTC).isoformat(),
             "database": "connected",
-            "collections": {
-                "articles": {"total": articles_count, "unprocessed": unprocessed_articles},
-                "users": users_count,
-                "rss_feeds": rss_feeds_count,
-            },
+            "collections": collections,
         }
     except Exception as e:
         return {"status": "unhealthy", "error": str(e), "timestamp": datetime.now(UTC).isoformat()}
@@ -4,11 +4,11 @@ import logging
 import json
 
 import feedparser
-from dependencies import get_db_client, get_gemini_api_key
+from dependencies import get_db_client, get_gemini_api_key, get_genai_client
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel, HttpUrl
-from google import genai
 from google.genai import types
+from shared.cache import SingleFlight, TTLCache, normalize_prompt
 
 router = APIRouter(tags=["RSS Feeds"])
 logger = logging.getLogger(__name__)
@@ -27,6 +27,14 @@ STANDARD_CATEGORIES = {
     "Education": ["education", "learning", "academic"]
 }
 
+# Lowercased category name or synonym -> standard category, built once at import
+# so normalization is a single dict lookup instead of a scan over every list
+CATEGORY_LOOKUP: dict[str, str] = {}
+for _standard_cat, _synonyms in STANDARD_CATEGORIES.items():
+    for _alias in (_standard_cat.lower(), *_synonyms):
+        CATEGORY_LOOKUP.setdefault(_alias, _standard_cat)
+
+
 def standardize_category(raw_category: str | None) -> str:
     if not raw_category:
         return "Uncategorized"
@@ -34,12 +42,39 @@ def standardize_category(raw_category: str | None) -> str:
     # Clean and normalize the raw category
     cleaned_category = raw_category.strip().lower()
 
-    # Attempt to match against standard categories
-    for standard_cat, synonyms in STANDARD_CATEGORIES.items():
-        if cleaned_category == standard_cat.lower() or cleaned_category in synonyms:
-            return standard_cat # Return the standardized, regular capitalized name
+    # Return the standardized, regular capitalized name, or the original if no match
+    return CATEGORY_LOOKUP.get(cleaned_category, raw_category.strip())
+
+
+# Feed suggestion instruction and search-grounded config. Both are static, so
+# they are built once at import and every request sends the same prefix.
+RSS_SUGGEST_SYSTEM_INSTRUCTION = """
+You are an AI assistant specialized in finding and suggesting RSS feeds.
+Your goal is to help users discover relevant RSS feeds based on their queries.
+
+Instructions:
+- Use Google Search to find RSS feed URLs, titles, and a suitable category related to the user's query.
+- Prioritize official or well-known sources.
+- For each suggestion, provide the feed title, its URL, and a concise category (e.g., "Technology", "News", "Sports", "Cooking").
+- Format your response as a JSON array of objects, where each object has 'title', 'url', and 'category' keys.
+- If no relevant RSS feeds are found, return an empty JSON array.
+- Example format: [{"title": "TechCrunch", "url": "https://techcrunch.com/feed/", "category": "Technology"}]
+"""
 
-    return raw_category.strip() # Return original if no match
+RSS_SUGGEST_CONFIG = types.GenerateContentConfig(
+    system_instruction=RSS_SUGGEST_SYSTEM_INSTRUCTION,
+    tools=[types.Tool(google_search=types.GoogleSearch())],
+)
+
+# Feed suggestions for a given query change slowly, so repeat queries (often the
+# same popular interests) are served from memory for a day
+_feed_suggestion_cache = TTLCache(ttl=24 * 3600)
+_feed_suggestion_inflight = SingleFlight()
+
+RSS_SUGGEST_PROMPT = (
+    "Find RSS feeds related to: {query}. Provide the results as a JSON array of objects "
+    "with 'title', 'url', and 'category' keys."
+)
 
 
 class RssFeedCreate(BaseModel):
@@ -59,7 +94,7 @@ class RssFeedSuggestRequest(BaseModel):
 
 
 @router.post("/api/rss_feeds", status_code=status.HTTP_201_CREATED)
-async def create_rss_feed(feed: RssFeedCreate, db=Depends(get_db_client)):
+def create_rss_feed(feed: RssFeedCreate, db=Depends(get_db_client)):
     rss_feeds_collection = db.rss_feeds
     feed_id = str(uuid.uuid4())
 
@@ -94,34 +129,26 @@ async def suggest_rss_feeds(request: RssFeedSuggestRequest, api_key: str = Depen
     """
     Suggest RSS feeds based on a user query using Google Gemini and Google Search grounding.
     """
+    cache_key = normalize_prompt(request.query)
+    cached_suggestions = _feed_suggestion_cache.get(cache_key)
+    if cached_suggestions is not None:
+        return {"status": "success", "suggestions": cached_suggestions}
+
     try:
-        client = genai.Client(api_key=api_key)
-
-        system_instruction = """
-        You are an AI assistant specialized in finding and suggesting RSS feeds.
-        Your goal is to help users discover relevant RSS feeds based on their queries.
-
-        Instructions:
-        - Use Google Search to find RSS feed URLs, titles, and a suitable category related to the user's query.
-        - Prioritize official or well-known sources.
-        - For each suggestion, provide the feed title, its URL, and a concise category (e.g., "Technology", "News", "Sports", "Cooking").
-        - Format your response as a JSON array of objects, where each object has 'title', 'url', and 'category' keys.
-        - If no relevant RSS feeds are found, return an empty JSON array.
-        - Example format: [{"title": "TechCrunch", "url": "https://techcrunch.com/feed/", "category": "Technology"}]
-        """
-
-        config = types.GenerateContentConfig(
-            system_instruction=system_instruction,
-            tools=[types.Tool(google_search=types.GoogleSearch())]
-        )
+        client = get_genai_client(api_key)
 
         # The prompt should clearly ask the LLM to find RSS feeds and format the output
-        llm_prompt = f"Find RSS feeds related to: {request.query}. Provide the results as a JSON array of objects with 'title', 'url', and 'category' keys."
-
-        response = client.models.generate_content(
-            model="gemini-2.0-flash-exp",
-            contents=llm_prompt,
-            config=config
+        llm_prompt = RSS_SUGGEST_PROMPT.format(query=request.query)
+
+        # The async client keeps the event loop free while Gemini responds;
+        # identical requests arriving meanwhile share the same call
+        response = await _feed_suggestion_inflight.do(
+            cache_key,
+            lambda: client.aio.models.generate_content(
+                model="gemini-2.0-flash-exp",
+                contents=llm_prompt,
+                config=RSS_SUGGEST_CONFIG
+            ),
         )
 
         # Attempt to parse the LLM's response as JSON
@@ -144,6 +171,8 @@ async def suggest_rss_feeds(request: RssFeedSuggestRequest, api_key: str = Depen
             logger.warning(f"LLM response parsing error: {ve}. Response: {response.text}")
             suggestions = []
 
+        if suggestions:
+            _feed_suggestion_cache.set(cache_key, suggestions)
         return {
             "status": "success",
             "suggestions": suggestions
@@ -156,14 +185,14 @@ async def suggest_rss_feeds(request: RssFeedSuggestRequest, api_key: str = Depen
 
 
 @router.get("/api/rss_feeds", status_code=status.HTTP_200_OK)
-async def get_rss_feeds(db=Depends(get_db_client)):
+def get_rss_feeds(db=Depends(get_db_client)):
     rss_feeds_collection = db.rss_feeds
     feeds = list(rss_feeds_collection.find({}, {"_id": 0}))
     return {"data": feeds}
 
 
 @router.get("/api/rss_feeds/{feed_id}", status_code=status.HTTP_200_OK)
-async def get_rss_feed(feed_id: str, db=Depends(get_db_client)):
+def get_rss_feed(feed_id: str, db=Depends(get_db_client)):
     rss_feeds_collection = db.rss_feeds
     feed = rss_feeds_collection.find_one({"id": feed_id}, {"_id": 0})
     if not feed:
@@ -172,7 +201,7 @@ async def get_rss_feed(feed_id: str, db=Depends(get_db_client)):
 
 
 @router.put("/api/rss_feeds/{feed_id}", status_code=status.HTTP_200_OK)
-async def update_rss_feed(feed_id: str, feed_update: RssFeedUpdate, db=Depends(get_db_client)):
+def update_rss_feed(feed_id: str, feed_update: RssFeedUpdate, db=Depends(get_db_client)):
     rss_feeds_collection = db.rss_feeds
 
     update_fields = {}
@@ -199,7 +228,7 @@ async def update_rss_feed(feed_id: str, feed_update: RssFeedUpdate, db=Depends(g
 
 
 @router.delete("/api/rss_feeds/{feed_id}", status_code=status.HTTP_200_OK)
-async def delete_rss_feed(feed_id: str, db=Depends(get_db_client)):
+def delete_rss_feed(feed_id: str, db=Depends(get_db_client)):
     rss_feeds_collection = db.rss_feeds
     result = rss_feeds_collection.delete_one({"id": feed_id})
     if result.deleted_count == 0:
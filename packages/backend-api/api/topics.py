@@ -1,13 +1,50 @@
 import logging
+import re
 
-from google import genai
-from dependencies import get_gemini_api_key
-from fastapi import APIRouter, HTTPException, status
+from dependencies import get_gemini_api_key, get_genai_client
+from fastapi import APIRouter, Depends, HTTPException, status
+from google.genai import types
 from pydantic import BaseModel
+from shared.cache import SingleFlight, TTLCache, normalize_prompt
 
 router = APIRouter(tags=["Topics"])
 logger = logging.getLogger(__name__)
 
+# Suggestions depend only on the request inputs, so identical requests within
+# the TTL are answered without another Gemini round-trip.
+_suggestion_cache = TTLCache(ttl=3600)
+_suggestion_inflight = SingleFlight()
+
+# Leading list markers the model sometimes adds despite the prompt ("1. ", "2) ", "- ", "* ")
+_SUGGESTION_PREFIX_RE = re.compile(r"^\s*(?:\d+[.)]|[-*•])\s+")
+
+# Output-format rules shared by every suggestion request. Sent as a static system
+# instruction so the prompt prefix is byte-identical across calls (and eligible for
+# Gemini's implicit prompt caching); only the short per-request ask varies.
+TOPIC_SUGGEST_SYSTEM_INSTRUCTION = (
+    "You suggest specific, relevant news topics for a personal news digest. "
+    "Return ONLY the topic names as a comma-separated list, no explanations or numbering."
+)
+
+TOPIC_SUGGEST_CONFIG = types.GenerateContentConfig(
+    system_instruction=TOPIC_SUGGEST_SYSTEM_INSTRUCTION,
+)
+
+# Per-request asks; only the placeholders vary between calls
+QUERY_TOPICS_PROMPT = (
+    'Based on the search query "{query}", suggest 5-8 specific, relevant '
+    "news topics that someone interested in this area would want to follow."
+)
+RELATED_TOPICS_PROMPT = (
+    "A user is interested in: {interests}. "
+    "Suggest 5-8 additional related news topics they might want to follow."
+)
+POPULAR_TOPICS_PROMPT = "Suggest 8 popular news topics that most people would be interested in following."
+
+# Suggestions are a short, tool-free list completion, so the lightweight model is
+# plenty and answers noticeably faster than the full Flash model
+TOPIC_SUGGEST_MODEL = "gemini-2.0-flash-lite"
+
 
 class TopicSuggestRequest(BaseModel):
     interests: list[str] = []
@@ -21,56 +58,59 @@ class TopicSuggestResponse(BaseModel):
 @router.post(
     "/api/topics/suggest", status_code=status.HTTP_200_OK, response_model=TopicSuggestResponse
 )
-async def suggest_topics(request: TopicSuggestRequest):
+async def suggest_topics(request: TopicSuggestRequest, api_key: str = Depends(get_gemini_api_key)):
     """
     Suggest relevant topics based on user interests or a search query.
     Uses Google Gemini to generate intelligent topic suggestions.
     """
+    cache_key = (
+        normalize_prompt(request.query),
+        tuple(sorted({normalize_prompt(interest) for interest in request.interests})),
+    )
+    cached_suggestions = _suggestion_cache.get(cache_key)
+    if cached_suggestions is not None:
+        return TopicSuggestResponse(suggestions=cached_suggestions)
+
     try:
-        gemini_key = get_gemini_api_key()
-        client = genai.Client(api_key=gemini_key)
+        client = get_genai_client(api_key)
 
         if request.query:
             # User provided a search query
-            prompt = f"""Based on the search query "{request.query}", suggest 5-8 specific, relevant news topics
-            that someone interested in this area would want to follow. Return ONLY the topic names as a
-            comma-separated list, no explanations or numbering."""
+            prompt = QUERY_TOPICS_PROMPT.format(query=request.query)
         elif request.interests:
             # User has existing interests, suggest related topics
-            interests_str = ", ".join(request.interests)
-            prompt = f"""A user is interested in: {interests_str}.
-            Suggest 5-8 additional related news topics they might want to follow.
-            Return ONLY the topic names as a comma-separated list, no explanations or numbering."""
+            prompt = RELATED_TOPICS_PROMPT.format(interests=", ".join(request.interests))
         else:
             # No input provided, suggest popular topics
-            prompt = """Suggest 8 popular news topics that most people would be interested in following.
-            Return ONLY the topic names as a comma-separated list, no explanations or numbering."""
+            prompt = POPULAR_TOPICS_PROMPT
 
-        response = client.models.generate_content(
-            model="gemini-2.0-flash-exp",
-            contents=prompt
+        # The async client keeps the event loop free while Gemini responds;
+        # identical requests arriving meanwhile share the same call
+        response = await _suggestion_inflight.do(
+            cache_key,
+            lambda: client.aio.models.generate_content(
+                model=TOPIC_SUGGEST_MODEL,
+                contents=prompt,
+                config=TOPIC_SUGGEST_CONFIG
+            ),
         )
         suggestions_text = response.text.strip()
 
-        # Parse comma-separated suggestions
-        suggestions = [s.strip() for s in suggestions_text.split(",") if s.strip()]
-
-        # Clean up any numbering or bullets that might have been included
-        cleaned_suggestions = []
-        for suggestion in suggestions:
-            # Remove common prefixes like "1.", "- ", etc.
-            cleaned = suggestion
-            if ". " in cleaned:
-                cleaned = cleaned.split(". ", 1)[-1]
-            if cleaned.startswith("- "):
-                cleaned = cleaned[2:]
-            cleaned_suggestions.append(cleaned.strip())
+        # Parse comma-separated suggestions, stripping any numbering or bullets
+        cleaned_suggestions = [
+            cleaned
+            for s in suggestions_text.split(",")
+            if (cleaned := _SUGGESTION_PREFIX_RE.sub("", s).strip())
+        ]
 
         logger.info(
             f"Generated {len(cleaned_suggestions)} topic suggestions for query='{request.query}', interests={request.interests}"
         )
 
-        return TopicSuggestResponse(suggestions=cleaned_suggestions[:8])
+        top_suggestions = cleaned_suggestions[:8]
+        if top_suggestions:
+            _suggestion_cache.set(cache_key, top_suggestions)
+        return TopicSuggestResponse(suggestions=top_suggestions)
 
     except Exception as e:
         logger.error(f"Failed to generate topic suggestions: {str(e)}")
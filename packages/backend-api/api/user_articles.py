@@ -8,13 +8,25 @@ This replaces the global 'processed' flag with per-user tracking.
 import uuid
 from datetime import UTC, datetime
 
+from api.articles import ArticleSummary
 from auth import User, get_current_user
 from dependencies import get_db_client
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
+from shared.articles import article_summary_projection, derive_source
 
 router = APIRouter(tags=["User Articles"])
 
+# Joins a user_articles document to its article as an "article" array field
+ARTICLE_LOOKUP_STAGE = {
+    "$lookup": {
+        "from": "articles",
+        "localField": "article_id",
+        "foreignField": "id",
+        "as": "article",
+    }
+}
+
 
 class UserArticleCreate(BaseModel):
     article_id: str
@@ -28,8 +40,25 @@ class UserArticleUpdate(BaseModel):
     bookmarked: bool | None = None
 
 
+class BookmarkedArticle(ArticleSummary):
+    bookmarked: bool = True
+
+
+class BookmarkListResponse(BaseModel):
+    data: list[BookmarkedArticle]
+
+
+class NewsletterIssue(BaseModel):
+    date: str
+    articles: list[ArticleSummary]
+
+
+class NewsletterHistoryResponse(BaseModel):
+    newsletters: list[NewsletterIssue]
+
+
 @router.post("/api/users/{user_id}/articles", status_code=status.HTTP_201_CREATED)
-async def track_article_for_user(
+def track_article_for_user(
     user_id: str,
     user_article: UserArticleCreate,
     db=Depends(get_db_client),
@@ -40,10 +69,11 @@ async def track_article_for_user(
     Used by newsletter generation function.
     """
     user_articles_collection = db.user_articles
+    now = datetime.now(UTC)
 
     # Check if relationship already exists
     existing = user_articles_collection.find_one(
-        {"user_id": user_id, "article_id": user_article.article_id}
+        {"user_id": user_id, "article_id": user_article.article_id}, {"_id": 1}
     )
 
     if existing:
@@ -51,7 +81,7 @@ async def track_article_for_user(
         update_fields = {}
         if user_article.sent_in_newsletter:
             update_fields["sent_in_newsletter"] = True
-            update_fields["sent_at"] = datetime.now(UTC)
+            update_fields["sent_at"] = now
         if user_article.read:
             update_fields["read"] = True
         if user_article.bookmarked:
@@ -75,10 +105,10 @@ async def track_article_for_user(
         "user_id": user_id,
         "article_id": user_article.article_id,
         "sent_in_newsletter": user_article.sent_in_newsletter,
-        "sent_at": datetime.now(UTC) if user_article.sent_in_newsletter else None,
+        "sent_at": now if user_article.sent_in_newsletter else None,
         "read": user_article.read,
         "bookmarked": user_article.bookmarked,
-        "created_at": datetime.now(UTC),
+        "created_at": now,
     }
 
     user_articles_collection.insert_one(new_user_article)
@@ -91,7 +121,7 @@ async def track_article_for_user(
 
 
 @router.put("/api/users/{user_id}/articles/{article_id}", status_code=status.HTTP_200_OK)
-async def update_user_article(
+def update_user_article(
     user_id: str,
     article_id: str,
     user_article_update: UserArticleUpdate,
@@ -145,7 +175,7 @@ async def update_user_article(
 
 
 @router.get("/api/users/{user_id}/articles/sent", status_code=status.HTTP_200_OK)
-async def get_sent_articles_for_user(
+def get_sent_articles_for_user(
     user_id: str, db=Depends(get_db_client), user: User = Depends(get_current_user)
 ):
     """Get list of article IDs that have been sent to this user in newsletters."""
@@ -167,13 +197,16 @@ async def get_sent_articles_for_user(
     return {"article_ids": [a["article_id"] for a in sent_articles]}
 
 
-@router.get("/api/users/{user_id}/bookmarks", status_code=status.HTTP_200_OK)
-async def get_bookmarked_articles(
+@router.get(
+    "/api/users/{user_id}/bookmarks",
+    status_code=status.HTTP_200_OK,
+    response_model=BookmarkListResponse,
+)
+def get_bookmarked_articles(
     user_id: str, db=Depends(get_db_client), user: User = Depends(get_current_user)
 ):
     """Get full article details for bookmarked articles."""
     user_articles_collection = db.user_articles
-    articles_collection = db.articles
 
     # Verify user matches authenticated user
     if user_id != user.sub:
@@ -182,50 +215,34 @@ async def get_bookmarked_articles(
             detail="You can only view your own bookmarks.",
         )
 
-    # Get bookmarked article IDs
-    bookmarked = list(
-        user_articles_collection.find(
-            {"user_id": user_id, "bookmarked": True}, {"article_id": 1, "_id": 0}
+    # Join bookmarks to their articles server-side, so the list costs one
+    # round-trip instead of an id query followed by an article query
+    articles = list(
+        user_articles_collection.aggregate(
+            [
+                {"$match": {"user_id": user_id, "bookmarked": True}},
+                {"$project": {"_id": 0, "article_id": 1}},
+                ARTICLE_LOOKUP_STAGE,
+                {"$unwind": "$article"},
+                {"$project": {"_id": 0, **article_summary_projection("article.")}},
+            ]
         )
     )
-    article_ids = [b["article_id"] for b in bookmarked]
-
-    # Fetch full article details
-    articles = list(articles_collection.find({"id": {"$in": article_ids}}, {"_id": 0}))
 
-    # Transform to match frontend expectations
-    transformed = []
+    # Summaries arrive in frontend field names; only the source is derived here
     for article in articles:
-        source = article.get("source")
-        if not source or source == "rss":
-            link = article.get("link", "")
-            if link:
-                from urllib.parse import urlparse
-
-                domain = urlparse(link).netloc
-                source = domain.replace("www.", "").split(".")[0].title() if domain else "RSS"
-            else:
-                source = "RSS"
-
-        transformed.append(
-            {
-                "id": article.get("id"),
-                "title": article.get("title"),
-                "description": article.get("summary"),
-                "url": article.get("link"),
-                "published_at": article.get("published"),
-                "source": source,
-                "feed_id": article.get("feed_id"),
-                "feed_name": article.get("feed_name"),
-                "bookmarked": True,
-            }
-        )
+        article["source"] = derive_source(article)
+        article["bookmarked"] = True
 
-    return {"data": transformed}
+    return {"data": articles}
 
 
-@router.get("/api/users/{user_id}/newsletters", status_code=status.HTTP_200_OK)
-async def get_newsletter_history(
+@router.get(
+    "/api/users/{user_id}/newsletters",
+    status_code=status.HTTP_200_OK,
+    response_model=NewsletterHistoryResponse,
+)
+def get_newsletter_history(
     user_id: str, db=Depends(get_db_client), user: User = Depends(get_current_user)
 ):
     """
@@ -233,7 +250,6 @@ async def get_newsletter_history(
     Returns articles grouped by sent_at date.
     """
     user_articles_collection = db.user_articles
-    articles_collection = db.articles
 
     # Verify user matches authenticated user
     if user_id != user.sub:
@@ -242,57 +258,35 @@ async def get_newsletter_history(
             detail="You can only view your own newsletter history.",
         )
 
-    # Get all articles sent in newsletters, sorted by date
-    sent_articles = list(
-        user_articles_collection.find(
-            {"user_id": user_id, "sent_in_newsletter": True}, {"_id": 0}
-        ).sort("sent_at", -1)
+    # Get all articles sent in newsletters, newest first, joined to their article
+    # documents in the same round-trip. $match/$sort run ahead of the $lookup so
+    # the planner can serve them from the sent-articles index.
+    sent_articles = user_articles_collection.aggregate(
+        [
+            {"$match": {"user_id": user_id, "sent_in_newsletter": True}},
+            {"$sort": {"sent_at": -1}},
+            {"$project": {"_id": 0, "article_id": 1, "sent_at": 1}},
+            ARTICLE_LOOKUP_STAGE,
+            {"$unwind": "$article"},
+            {"$project": {"sent_at": 1, "article": article_summary_projection("article.")}},
+        ]
     )
 
-    # Group by date
+    # Group by date, keeping each article once per newsletter
     newsletters_by_date = {}
     for ua in sent_articles:
         sent_date = ua.get("sent_at")
         if sent_date:
             date_key = sent_date.strftime("%Y-%m-%d")
-            if date_key not in newsletters_by_date:
-                newsletters_by_date[date_key] = []
-            newsletters_by_date[date_key].append(ua["article_id"])
+            article = ua["article"]
+            newsletters_by_date.setdefault(date_key, {}).setdefault(article.get("id"), article)
 
-    # Fetch article details for each newsletter
     result = []
-    for date_key, article_ids in newsletters_by_date.items():
-        articles = list(articles_collection.find({"id": {"$in": article_ids}}, {"_id": 0}))
-
-        # Transform articles
-        transformed = []
-        for article in articles:
-            source = article.get("source")
-            if not source or source == "rss":
-                link = article.get("link", "")
-                if link:
-                    from urllib.parse import urlparse
-
-                    domain = urlparse(link).netloc
-                    source = (
-                        domain.replace("www.", "").split(".")[0].title() if domain else "RSS"
-                    )
-                else:
-                    source = "RSS"
-
-            transformed.append(
-                {
-                    "id": article.get("id"),
-                    "title": article.get("title"),
-                    "description": article.get("summary"),
-                    "url": article.get("link"),
-                    "published_at": article.get("published"),
-                    "source": source,
-                    "feed_id": article.get("feed_id"),
-                    "feed_name": article.get("feed_name"),
-                }
-            )
+    for date_key, articles in newsletters_by_date.items():
+        # Summaries arrive in frontend field names; only the source is derived here
+        for article in articles.values():
+            article["source"] = derive_source(article)
 
-        result.append({"date": date_key, "articles": transformed})
+        result.append({"date": date_key, "articles": list(articles.values())})
 
     return {"newsletters": result}
@@ -5,6 +5,7 @@ from auth import User, get_current_user
 from dependencies import get_db_client  # Import the new dependency
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
+from pymongo import ReturnDocument
 
 logger = logging.getLogger(__name__)
 router = APIRouter(tags=["Users"])
@@ -20,7 +21,7 @@ class UserUpdate(BaseModel):
 
 
 @router.post("/api/users", status_code=status.HTTP_200_OK)
-async def create_user(
+def create_user(
     user_create: UserCreate, db=Depends(get_db_client), user: User = Depends(get_current_user)
 ):
     users_collection = db.users
@@ -34,43 +35,46 @@ async def create_user(
             detail="Email not available in user token. Please ensure the 'email' scope is included.",
         )
 
-    existing_user_by_id = users_collection.find_one({"user_id": user_id})
+    # Look the user up by user_id and by email in one round-trip; a user_id match
+    # still takes precedence over an email match
+    matching_users = list(
+        users_collection.find(
+            {"$or": [{"user_id": user_id}, {"email": email}]}, {"_id": 0, "user_id": 1}
+        )
+    )
 
-    if existing_user_by_id:
+    if any(existing.get("user_id") == user_id for existing in matching_users):
         # User exists and is correctly identified by user_id
         users_collection.update_one(
             {"user_id": user_id}, {"$addToSet": {"topics": {"$each": user_create.topics}}}
         )
         message = "User topics updated."
+    elif matching_users:
+        # Matched by email only: the account is missing user_id, so we link it
+        users_collection.update_one(
+            {"email": email},
+            {
+                "$set": {"user_id": user_id, "email": email},  # Ensure email is consistent
+                "$addToSet": {"topics": {"$each": user_create.topics}},
+            },
+        )
+        message = "User account linked and topics updated."
     else:
-        # User not found by user_id, try to find by email
-        existing_user_by_email = users_collection.find_one({"email": email})
-        if existing_user_by_email:
-            # User exists but is missing user_id, so we link it
-            users_collection.update_one(
-                {"email": email},
-                {
-                    "$set": {"user_id": user_id, "email": email},  # Ensure email is consistent
-                    "$addToSet": {"topics": {"$each": user_create.topics}},
-                },
-            )
-            message = "User account linked and topics updated."
-        else:
-            # This is a completely new user
-            new_user = {
-                "user_id": user_id,
-                "email": email,
-                "topics": user_create.topics,
-                "created_at": datetime.now(UTC),
-            }
-            users_collection.insert_one(new_user)
-            message = "New user created."
+        # This is a completely new user
+        new_user = {
+            "user_id": user_id,
+            "email": email,
+            "topics": user_create.topics,
+            "created_at": datetime.now(UTC),
+        }
+        users_collection.insert_one(new_user)
+        message = "New user created."
 
     return {"message": message, "user_id": user_id}
 
 
 @router.put("/api/users/{user_id}", status_code=status.HTTP_200_OK)
-async def update_user(
+def update_user(
     user_id: str,
     user_update: UserUpdate,
     db=Depends(get_db_client),
@@ -115,17 +119,19 @@ async def update_user(
             elif 'google' in user.iss or 'accounts.google' in user.iss:
                 oauth_provider = "google"
 
-        # First link the OAuth account
-        link_result = users_collection.update_one(
+        # Link the OAuth account and apply the requested fields in one write
+        result = users_collection.update_one(
             {"email": user_email},
-            {"$set": {"user_id": authenticated_user_id, "oauth_provider": oauth_provider, "oauth_id": authenticated_user_id}}
+            {
+                "$set": {
+                    "user_id": authenticated_user_id,
+                    "oauth_provider": oauth_provider,
+                    "oauth_id": authenticated_user_id,
+                    **update_fields,
+                },
+                "$currentDate": {"updated_at": True},
+            },
         )
-        if link_result.matched_count > 0:
-            # Now update with the requested fields
-            result = users_collection.update_one(
-                {"user_id": authenticated_user_id},
-                {"$set": update_fields, "$currentDate": {"updated_at": True}},
-            )
 
     if result.matched_count == 0:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found.")
@@ -134,7 +140,7 @@ async def update_user(
 
 
 @router.get("/api/users/{user_id}", status_code=status.HTTP_200_OK)
-async def get_user(
+def get_user(
     user_id: str, db=Depends(get_db_client), user: User = Depends(get_current_user)
 ):
     """
@@ -158,29 +164,23 @@ async def get_user(
     # If not found by user_id, try to find by email (for OAuth users linking to email/password accounts)
     if not user_data and user_email:
         logger.info(f"GET /api/users - Trying lookup by email: {user_email}")
-        user_data = users_collection.find_one({"email": user_email}, {"_id": 0})
-        logger.info(f"GET /api/users - Found by email: {bool(user_data)}")
-
-        # If found by email, update the user_id to link the OAuth account
-        if user_data:
-            logger.info(f"GET /api/users - Database user_id: {user_data.get('user_id')}, Token sub: {user.sub}")
-            # Detect OAuth provider from token issuer
-            oauth_provider = "unknown"
-            if user.iss:
-                logger.info(f"GET /api/users - Detected issuer: {user.iss}")
-                if 'microsoft' in user.iss.lower() or 'login.microsoftonline' in user.iss.lower():
-                    oauth_provider = "entra_id"
-                elif 'google' in user.iss.lower() or 'accounts.google' in user.iss.lower():
-                    oauth_provider = "google"
-
-            logger.info(f"GET /api/users - Linking account: oauth_provider={oauth_provider}")
-            users_collection.update_one(
-                {"email": user_email},
-                {"$set": {"user_id": authenticated_user_id, "oauth_provider": oauth_provider, "oauth_id": authenticated_user_id}}
-            )
-            # Refetch to get updated data
-            user_data = users_collection.find_one({"user_id": authenticated_user_id}, {"_id": 0})
-            logger.info(f"GET /api/users - After linking, found user: {bool(user_data)}")
+        # Detect OAuth provider from token issuer
+        oauth_provider = "unknown"
+        if user.iss:
+            logger.info(f"GET /api/users - Detected issuer: {user.iss}")
+            if 'microsoft' in user.iss.lower() or 'login.microsoftonline' in user.iss.lower():
+                oauth_provider = "entra_id"
+            elif 'google' in user.iss.lower() or 'accounts.google' in user.iss.lower():
+                oauth_provider = "google"
+
+        # Link the OAuth account and read back the updated user in one round-trip
+        user_data = users_collection.find_one_and_update(
+            {"email": user_email},
+            {"$set": {"user_id": authenticated_user_id, "oauth_provider": oauth_provider, "oauth_id": authenticated_user_id}},
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER,
+        )
+        logger.info(f"GET /api/users - Found by email and linked ({oauth_provider}): {bool(user_data)}")
 
     if not user_data:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found.")
@@ -188,7 +188,7 @@ async def get_user(
 
 
 @router.delete("/api/users/{user_id}", status_code=status.HTTP_200_OK)
-async def delete_user(user_id: str, db=Depends(get_db_client)):
+def delete_user(user_id: str, db=Depends(get_db_client)):
     users_collection = db.users
     result = users_collection.delete_one({"user_id": user_id})
     if result.deleted_count == 0:
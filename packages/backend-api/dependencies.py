@@ -1,45 +1,110 @@
+import logging
 import os
+import threading
+from functools import lru_cache
 
 from dotenv import load_dotenv
+from google import genai
 from pymongo import MongoClient
+from pymongo.errors import ConnectionFailure
+from shared.cache import TTLCache
 from shared.key_vault_client import KeyVaultClient
 
 load_dotenv()
+logger = logging.getLogger(__name__)
 
-_db_client = None
-_key_vault_client = None
+# Key Vault secrets read on the request path. Every Gemini-backed request needs the
+# API key, and fetching it is a network round-trip to Key Vault; the TTL bounds how
+# long a rotated secret takes to be picked up. get_gemini_api_key is a sync
+# dependency run concurrently in FastAPI's threadpool; TTLCache is thread-safe,
+# and the fetch lock keeps a burst of requests on a cold cache to one Key Vault call.
+_secret_cache = TTLCache(ttl=300)
+_secret_fetch_lock = threading.Lock()
 
+# (collection, index keys) for every field the API and functions filter or join on.
+# Cosmos DB's Mongo API only indexes _id by default, so anything missing here is
+# a full collection scan. Creation is best-effort, so queries leave index choice to
+# the planner rather than hinting an index that may be missing (a bad hint fails
+# the query outright).
+MONGO_INDEXES = [
+    # Per-user "sent in newsletter" lookups and newsletter history
+    ("user_articles", [("user_id", 1), ("sent_in_newsletter", 1), ("sent_at", -1)]),
+    ("user_articles", [("user_id", 1), ("article_id", 1)]),
+    # Per-user bookmark listing
+    ("user_articles", [("user_id", 1), ("bookmarked", 1)]),
+    # Article lookups by id, including the user_articles -> articles $lookup
+    ("articles", [("id", 1)]),
+    # Duplicate checks on create and the crawler's $in existence checks
+    ("articles", [("link", 1)]),
+    # Recent-article window read by the newsletter generator
+    ("articles", [("created_at", -1)]),
+    ("articles", [("processed", 1)]),
+    ("users", [("user_id", 1)]),
+    ("users", [("email", 1)]),
+    ("sessions", [("session_id", 1)]),
+    ("sessions", [("user_id", 1)]),
+    ("rss_feeds", [("id", 1)]),
+]
 
+
+def ensure_indexes(db) -> None:
+    """
+    Create the indexes the API queries rely on. Safe to call repeatedly.
+
+    Run once at application start-up (see main.lifespan), not on the request path.
+    """
+    for collection_name, keys in MONGO_INDEXES:
+        try:
+            db[collection_name].create_index(keys)
+        except ConnectionFailure as e:
+            # Unreachable server: every remaining index would wait out the same
+            # server-selection timeout, so give up on the rest
+            logger.warning(f"Skipping MongoDB index creation, database unreachable: {e}")
+            return
+        except Exception as e:
+            logger.warning(f"Could not ensure MongoDB index {keys} on {collection_name}: {e}")
+
+
+# The client getters below are process-wide singletons. lru_cache memoizes them
+# with a C-level lookup on every call after the first (get_db_client runs on
+# every request) and exposes cache_clear() for tests.
+
+
+@lru_cache(maxsize=None)
 def get_key_vault_client() -> KeyVaultClient:
     """Get or create Key Vault client singleton"""
-    global _key_vault_client
-    if _key_vault_client is None:
-        _key_vault_client = KeyVaultClient()
-    return _key_vault_client
+    return KeyVaultClient()
 
 
+@lru_cache(maxsize=None)
 def get_db_client():
     """Get or create MongoDB client singleton"""
-    global _db_client
-    if _db_client is None:
-        # Try to get connection string from environment (for local dev)
-        connection_string = os.getenv("MONGODB_CONNECTION_STRING")
+    # Try to get connection string from environment (for local dev)
+    connection_string = os.getenv("MONGODB_CONNECTION_STRING")
+
+    # If not in env, try to get from Key Vault
+    if not connection_string:
+        try:
+            kv_client = get_key_vault_client()
+            connection_string = kv_client.get_secret("COSMOS-DB-CONNECTION-STRING-UP2D8")
+        except Exception as e:
+            logger.warning(f"Could not retrieve MongoDB connection from Key Vault: {e}")
+            # Fall back to localhost for local development
+            connection_string = "mongodb://localhost:27017/"
 
-        # If not in env, try to get from Key Vault
-        if not connection_string:
-            try:
-                kv_client = get_key_vault_client()
-                connection_string = kv_client.get_secret("COSMOS-DB-CONNECTION-STRING-UP2D8")
-            except Exception as e:
-                print(f"Warning: Could not retrieve MongoDB connection from Key Vault: {e}")
-                # Fall back to localhost for local development
-                connection_string = "mongodb://localhost:27017/"
+    client = MongoClient(connection_string)
+    database_name = os.getenv("MONGODB_DATABASE", "up2d8")
+    return client[database_name]
 
-        client = MongoClient(connection_string)
-        database_name = os.getenv("MONGODB_DATABASE", "up2d8")
-        _db_client = client[database_name]
 
-    return _db_client
+@lru_cache(maxsize=None)
+def get_genai_client(api_key: str) -> genai.Client:
+    """Get or create the google-genai client for an API key.
+
+    Clients hold their own HTTP connection pools and are safe to share across
+    requests, so one per key is reused instead of rebuilding it on every call.
+    """
+    return genai.Client(api_key=api_key)
 
 
 def get_gemini_api_key() -> str:
@@ -47,11 +112,19 @@ def get_gemini_api_key() -> str:
     api_key = os.getenv("GEMINI_API_KEY")
 
     if not api_key:
-        try:
-            kv_client = get_key_vault_client()
-            api_key = kv_client.get_secret("UP2D8-GEMINI-API-KEY")
-        except Exception as e:
-            print(f"Error: Could not retrieve Gemini API key: {e}")
-            raise
+        api_key = _secret_cache.get("UP2D8-GEMINI-API-KEY")
+
+    if not api_key:
+        with _secret_fetch_lock:
+            # Another request may have fetched it while this one waited
+            api_key = _secret_cache.get("UP2D8-GEMINI-API-KEY")
+            if not api_key:
+                try:
+                    kv_client = get_key_vault_client()
+                    api_key = kv_client.get_secret("UP2D8-GEMINI-API-KEY")
+                except Exception as e:
+                    logger.error(f"Could not retrieve Gemini API key: {e}")
+                    raise
+                _secret_cache.set("UP2D8-GEMINI-API-KEY", api_key)
 
     return api_key
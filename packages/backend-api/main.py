@@ -1,3 +1,4 @@
+import asyncio
 import os
 from contextlib import asynccontextmanager
 
@@ -16,6 +17,7 @@ from api import (
     auth as auth_routes,
 )
 from auth import azure_scheme
+from dependencies import ensure_indexes, get_db_client
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -23,9 +25,13 @@ from fastapi.middleware.cors import CORSMiddleware
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
-    Load the OpenID configuration on startup.
+    Load the OpenID configuration and ensure MongoDB indexes on startup.
     """
     await azure_scheme.openid_config.load_config()
+    # Index builds are blocking round-trips, so run them here once rather than
+    # inside the first request's get_db_client call
+    get_db = app.dependency_overrides.get(get_db_client, get_db_client)
+    await asyncio.to_thread(ensure_indexes, get_db())
     yield
 
 
@@ -0,0 +1,46 @@
+from functools import lru_cache
+from urllib.parse import urlparse
+
+# Article summary fields returned by list endpoints, keyed by API field name with
+# the stored field each is read from. Leaves out the full crawled content and other
+# bulky fields that the lists never return.
+ARTICLE_SUMMARY_FIELDS = {
+    "id": "id",
+    "title": "title",
+    "description": "summary",
+    "url": "link",
+    "published_at": "published",
+    "source": "source",
+    "feed_id": "feed_id",
+    "feed_name": "feed_name",
+}
+
+
+def article_summary_projection(prefix: str = "") -> dict:
+    """$project spec that returns article summaries under the API's field names.
+
+    Renaming happens in the database, so list endpoints get documents already in
+    response shape and only fill in the derived source. ``prefix`` addresses an
+    embedded article, e.g. ``"article."`` after a $lookup.
+    """
+    return {name: f"${prefix}{field}" for name, field in ARTICLE_SUMMARY_FIELDS.items()}
+
+
+@lru_cache(maxsize=1024)
+def _source_from_domain(domain: str) -> str:
+    # Remove www. and get the main domain
+    return domain.replace("www.", "").split(".")[0].title() if domain else "RSS"
+
+
+def derive_source(article: dict) -> str:
+    """Display name for an article's source, derived from its link's domain for RSS items.
+
+    Accepts stored articles (``link``) as well as summaries already renamed to ``url``.
+    """
+    source = article.get("source")
+    if source and source != "rss":
+        return source
+
+    # Articles repeat a small set of feed domains, so the per-domain result is memoized
+    link = article.get("link") or article.get("url", "")
+    return _source_from_domain(urlparse(link).netloc) if link else "RSS"
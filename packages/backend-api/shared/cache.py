@@ -0,0 +1,79 @@
+import asyncio
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+# Sentence punctuation carries no meaning for cache matching ("What's new in AI?" vs
+# "whats new in ai"); symbols like "C++" or "C#" are left alone
+_PROMPT_STRIP_RE = re.compile(r"[.,!?;:'\"]")
+
+
+def normalize_prompt(text: str) -> str:
+    """Normalize case, punctuation and whitespace so trivially different prompts share a cache entry."""
+    return " ".join(_PROMPT_STRIP_RE.sub("", text.lower()).split())
+
+
+class TTLCache:
+    """
+    Small in-process cache whose entries expire ``ttl`` seconds after being set.
+
+    Holds at most ``maxsize`` entries, evicting the least recently used, so caches
+    keyed on free-form input (chat prompts, search queries) can't grow without
+    bound between the lazy expiry checks.
+
+    Safe to share across threads: sync dependencies and routes use it from
+    FastAPI's threadpool, and every read reorders the entries.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Any, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one in-flight call.
+
+    A response cache only helps once a call has finished; requests for the same key
+    that arrive while it is still running all join its result (or exception)
+    instead of starting their own.
+    """
+
+    def __init__(self):
+        self._inflight: dict[Any, asyncio.Future] = {}
+
+    async def do(self, key: Any, call: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(call())
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded so one caller disconnecting doesn't cancel the call for the others
+        return await asyncio.shield(future)
@@ -1,20 +1,20 @@
+import logging
 import os
+from functools import lru_cache
 
 from azure.identity import DefaultAzureCredential
 from azure.keyvault.secrets import SecretClient
 from dotenv import load_dotenv
 
-_secret_client = None
+logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=None)
 def get_secret_client() -> SecretClient:
-    global _secret_client
-    if _secret_client is None:
-        load_dotenv()
-        key_vault_uri = os.environ["KEY_VAULT_URI"]
-        credential = DefaultAzureCredential()
-        _secret_client = SecretClient(vault_url=key_vault_uri, credential=credential)
-    return _secret_client
+    load_dotenv()
+    key_vault_uri = os.environ["KEY_VAULT_URI"]
+    credential = DefaultAzureCredential()
+    return SecretClient(vault_url=key_vault_uri, credential=credential)
 
 
 class KeyVaultClient:
@@ -26,5 +26,5 @@ class KeyVaultClient:
             secret = self.client.get_secret(secret_name)
             return secret.value
         except Exception as e:
-            print(f"Error retrieving secret {secret_name}: {e}")
+            logger.error(f"Error retrieving secret {secret_name}: {e}")
             raise
@@ -9,21 +9,22 @@ client = TestClient(app)
 
 def test_get_articles():
     mock_articles_collection = MagicMock()
-    mock_articles_collection.find.return_value = [
+    # The aggregation returns summaries already renamed to the API's field names
+    mock_articles_collection.aggregate.return_value = [
         {
             "id": "article1",
             "title": "Test Article 1",
-            "summary": "Summary 1",
-            "link": "http://example.com/1",
-            "published": "2025-11-08T12:00:00Z",
+            "description": "Summary 1",
+            "url": "http://example.com/1",
+            "published_at": "2025-11-08T12:00:00Z",
             "source": "Example",
         },
         {
             "id": "article2",
             "title": "Test Article 2",
-            "summary": "Summary 2",
-            "link": "http://anotherexample.com/2",
-            "published": "2025-11-08T13:00:00Z",
+            "description": "Summary 2",
+            "url": "http://anotherexample.com/2",
+            "published_at": "2025-11-08T13:00:00Z",
             "source": "Another",
         },
     ]
@@ -41,6 +42,8 @@ def test_get_articles():
                 "url": "http://example.com/1",
                 "published_at": "2025-11-08T12:00:00Z",
                 "source": "Example",
+                "feed_id": None,
+                "feed_name": None,
             },
             {
                 "id": "article2",
@@ -49,6 +52,8 @@ def test_get_articles():
                 "url": "http://anotherexample.com/2",
                 "published_at": "2025-11-08T13:00:00Z",
                 "source": "Another",
+                "feed_id": None,
+                "feed_name": None,
             },
         ]
     }
@@ -80,3 +85,36 @@ def test_get_article_by_id_not_found():
     assert response.json() == {"detail": "Article not found."}
 
     app.dependency_overrides = {}
+
+
+def test_create_articles_batch_skips_existing_and_repeated_links():
+    mock_articles_collection = MagicMock()
+    mock_articles_collection.find.return_value = [{"link": "http://example.com/old"}]
+    mock_db = MagicMock(articles=mock_articles_collection)
+
+    app.dependency_overrides[get_db_client] = lambda: mock_db
+
+    def article(link):
+        return {"title": "T", "link": link, "summary": "S", "published": "2025-11-08"}
+
+    response = client.post(
+        "/api/articles/batch",
+        json={
+            "articles": [
+                article("http://example.com/old"),
+                article("http://example.com/new"),
+                article("http://example.com/new"),
+            ]
+        },
+    )
+    assert response.status_code == 201
+    assert response.json()["created"] == 1
+
+    # A single insert for the batch, containing only the unseen link
+    mock_articles_collection.insert_many.assert_called_once()
+    inserted = mock_articles_collection.insert_many.call_args[0][0]
+    assert [a["link"] for a in inserted] == ["http://example.com/new"]
+    assert response.json()["ids"] == [inserted[0]["id"]]
+    mock_db.analytics.insert_many.assert_called_once()
+
+    app.dependency_overrides = {}
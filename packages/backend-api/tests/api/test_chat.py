@@ -1,4 +1,9 @@
-from unittest.mock import MagicMock
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+from api import chat
+from dependencies import get_gemini_api_key
+from main import app
 
 
 def test_chat_endpoint(test_client, mocker):
@@ -13,6 +18,48 @@ def test_chat_endpoint(test_client, mocker):
     mock_generative_model.generate_content.assert_called_once_with("Hello Gemini")
 
 
+def test_chat_stream_endpoint(test_client, mocker):
+    client, _ = test_client
+    chat._chat_response_cache.clear()
+    app.dependency_overrides[get_gemini_api_key] = lambda: "test-key"
+
+    def make_chunk(text, grounding_metadata=None):
+        chunk = MagicMock()
+        chunk.text = text
+        chunk.candidates = [MagicMock(grounding_metadata=grounding_metadata)]
+        return chunk
+
+    web_chunk = MagicMock()
+    web_chunk.web.uri = "https://example.com"
+    web_chunk.web.title = "Example"
+    metadata = MagicMock(grounding_chunks=[web_chunk])
+
+    async def fake_stream():
+        yield make_chunk("Hello ")
+        yield make_chunk("world", metadata)
+
+    async def fake_generate_content_stream(**kwargs):
+        return fake_stream()
+
+    mock_genai_client = MagicMock()
+    mock_genai_client.aio.models.generate_content_stream = fake_generate_content_stream
+    mocker.patch("api.chat.get_genai_client", return_value=mock_genai_client)
+
+    response = client.post("/api/chat/stream", json={"prompt": "Hello Gemini"})
+    assert response.status_code == 200
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [e["text"] for e in events if e["type"] == "text"] == ["Hello ", "world"]
+    assert events[-1]["type"] == "sources"
+    assert events[-1]["sources"] == [{"web": {"uri": "https://example.com", "title": "Example"}}]
+    assert response.headers["x-accel-buffering"] == "no"
+
+    # The assembled reply is cached for later /api/chat and stream requests
+    assert chat._chat_response_cache.get("hello gemini")["reply"] == "Hello world"
+
+    app.dependency_overrides.pop(get_gemini_api_key)
+    chat._chat_response_cache.clear()
+
+
 def test_create_session(test_client, mocker):
     client, mock_db_client = test_client  # Unpack the fixture
     mock_sessions_collection = MagicMock()
@@ -52,7 +99,9 @@ def test_get_sessions_for_user(test_client, mocker):
     assert response.status_code == 200
     assert len(response.json()) == 2
     assert response.json()[0]["session_id"] == "session1"
-    mock_sessions_collection.find.assert_called_once_with({"user_id": "user1"}, {"_id": 0})
+    mock_sessions_collection.find.assert_called_once_with(
+        {"user_id": "user1"}, {"_id": 0, "messages": 0}
+    )
 
 
 def test_send_message_to_session(test_client, mocker):
@@ -110,6 +159,22 @@ def test_get_messages_from_session(test_client, mocker):
     )
 
 
+def test_get_messages_with_limit(test_client, mocker):
+    client, mock_db_client = test_client
+    mock_sessions_collection = MagicMock()
+    mock_db_client.sessions = mock_sessions_collection
+    mock_sessions_collection.find_one.return_value = {
+        "messages": [{"role": "model", "content": "Hello there"}]
+    }
+
+    response = client.get("/api/sessions/session1/messages?limit=1")
+    assert response.status_code == 200
+    assert response.json() == [{"role": "model", "content": "Hello there"}]
+    mock_sessions_collection.find_one.assert_called_once_with(
+        {"session_id": "session1"}, {"_id": 0, "messages": {"$slice": -1}}
+    )
+
+
 def test_get_messages_session_not_found(test_client, mocker):
     client, mock_db_client = test_client  # Unpack the fixture
     mock_sessions_collection = MagicMock()
@@ -120,3 +185,23 @@ def test_get_messages_session_not_found(test_client, mocker):
     response = client.get(f"/api/sessions/{session_id}/messages")
     assert response.status_code == 404
     assert response.json()["detail"] == "Session not found."
+
+
+def test_chat_reuses_cached_reply(test_client, mocker):
+    client, _ = test_client
+    chat._chat_response_cache.clear()
+    app.dependency_overrides[get_gemini_api_key] = lambda: "test-key"
+    mock_genai_client = MagicMock()
+    mock_genai_client.aio.models.generate_content = AsyncMock()
+    mock_genai_client.aio.models.generate_content.return_value.text = "Cached answer"
+    mock_genai_client.aio.models.generate_content.return_value.candidates = []
+    mocker.patch("api.chat.get_genai_client", return_value=mock_genai_client)
+
+    first = client.post("/api/chat", json={"prompt": "Latest AI news"})
+    second = client.post("/api/chat", json={"prompt": "  latest   AI news? "})
+    assert first.json() == second.json()
+    assert second.json()["reply"] == "Cached answer"
+    mock_genai_client.aio.models.generate_content.assert_awaited_once()
+
+    app.dependency_overrides.pop(get_gemini_api_key)
+    chat._chat_response_cache.clear()
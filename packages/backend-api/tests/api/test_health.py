@@ -0,0 +1,89 @@
+from unittest.mock import MagicMock
+
+from api import health
+from dependencies import get_db_client
+from fastapi.testclient import TestClient
+from main import app
+
+client = TestClient(app)
+
+
+def test_health_check():
+    health._collection_stats_cache.clear()
+    mock_db = MagicMock()
+    mock_db.articles.aggregate.return_value = iter(
+        [{"total": [{"count": 10}], "unprocessed": [{"count": 3}]}]
+    )
+    mock_db.users.count_documents.return_value = 4
+    mock_db.rss_feeds.count_documents.return_value = 2
+
+    app.dependency_overrides[get_db_client] = lambda: mock_db
+
+    response = client.get("/api/health")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "healthy"
+    assert body["database"] == "connected"
+    assert body["collections"] == {
+        "articles": {"total": 10, "unprocessed": 3},
+        "users": 4,
+        "rss_feeds": 2,
+    }
+    mock_db.command.assert_called_once_with("ping")
+
+    app.dependency_overrides = {}
+    health._collection_stats_cache.clear()
+
+
+def test_health_check_reuses_collection_counts():
+    health._collection_stats_cache.clear()
+    mock_db = MagicMock()
+    mock_db.articles.aggregate.return_value = iter(
+        [{"total": [{"count": 10}], "unprocessed": [{"count": 3}]}]
+    )
+    mock_db.users.count_documents.return_value = 4
+    mock_db.rss_feeds.count_documents.return_value = 2
+
+    app.dependency_overrides[get_db_client] = lambda: mock_db
+
+    first = client.get("/api/health")
+    second = client.get("/api/health")
+    assert second.json()["collections"] == first.json()["collections"]
+    # The database is pinged on every check; the counts are only read once
+    assert mock_db.command.call_count == 2
+    mock_db.articles.aggregate.assert_called_once()
+    mock_db.users.count_documents.assert_called_once()
+
+    app.dependency_overrides = {}
+    health._collection_stats_cache.clear()
+
+
+def test_health_check_empty_articles():
+    health._collection_stats_cache.clear()
+    mock_db = MagicMock()
+    mock_db.articles.aggregate.return_value = iter([{"total": [], "unprocessed": []}])
+    mock_db.users.count_documents.return_value = 0
+    mock_db.rss_feeds.count_documents.return_value = 0
+
+    app.dependency_overrides[get_db_client] = lambda: mock_db
+
+    response = client.get("/api/health")
+    assert response.status_code == 200
+    assert response.json()["collections"]["articles"] == {"total": 0, "unprocessed": 0}
+
+    app.dependency_overrides = {}
+    health._collection_stats_cache.clear()
+
+
+def test_health_check_database_error():
+    mock_db = MagicMock()
+    mock_db.command.side_effect = Exception("connection refused")
+
+    app.dependency_overrides[get_db_client] = lambda: mock_db
+
+    response = client.get("/api/health")
+    assert response.status_code == 200
+    assert response.json()["status"] == "unhealthy"
+    assert response.json()["error"] == "connection refused"
+
+    app.dependency_overrides = {}
@@ -1,6 +1,7 @@
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
-from dependencies import get_db_client
+from api import rss_feeds
+from dependencies import get_db_client, get_gemini_api_key
 from fastapi.testclient import TestClient
 from main import app
 
@@ -132,3 +133,24 @@ def test_delete_rss_feed_not_found():
     assert response.json() == {"detail": "RSS Feed not found."}
 
     app.dependency_overrides = {}
+
+
+def test_suggest_rss_feeds_caches_by_query(mocker):
+    rss_feeds._feed_suggestion_cache.clear()
+    app.dependency_overrides[get_gemini_api_key] = lambda: "test-key"
+    mock_genai_client = MagicMock()
+    mock_genai_client.aio.models.generate_content = AsyncMock()
+    mock_genai_client.aio.models.generate_content.return_value.text = (
+        '[{"title": "TechCrunch", "url": "https://techcrunch.com/feed/", "category": "Technology"}]'
+    )
+    mocker.patch("api.rss_feeds.get_genai_client", return_value=mock_genai_client)
+
+    first = client.post("/api/rss_feeds/suggest", json={"query": "Tech News"})
+    second = client.post("/api/rss_feeds/suggest", json={"query": "  tech   news"})
+    assert first.status_code == 200
+    assert second.json() == first.json()
+    assert first.json()["suggestions"][0]["title"] == "TechCrunch"
+    mock_genai_client.aio.models.generate_content.assert_awaited_once()
+
+    app.dependency_overrides = {}
+    rss_feeds._feed_suggestion_cache.clear()
@@ -0,0 +1,50 @@
+from unittest.mock import AsyncMock, MagicMock
+
+from api import topics
+from dependencies import get_gemini_api_key
+from fastapi.testclient import TestClient
+from main import app
+
+client = TestClient(app)
+
+
+def test_suggest_topics_strips_list_markers(mocker):
+    topics._suggestion_cache.clear()
+    app.dependency_overrides[get_gemini_api_key] = lambda: "test-key"
+    mock_genai_client = MagicMock()
+    mocker.patch("api.topics.get_genai_client", return_value=mock_genai_client)
+    mock_genai_client.aio.models.generate_content = AsyncMock()
+    mock_genai_client.aio.models.generate_content.return_value.text = (
+        "1. Artificial Intelligence, 2) U.S. Politics, - Space Exploration, , * Health"
+    )
+
+    response = client.post("/api/topics/suggest", json={"query": "tech"})
+    assert response.status_code == 200
+    assert response.json()["suggestions"] == [
+        "Artificial Intelligence",
+        "U.S. Politics",
+        "Space Exploration",
+        "Health",
+    ]
+
+    app.dependency_overrides.pop(get_gemini_api_key)
+    topics._suggestion_cache.clear()
+
+
+def test_suggest_topics_caches_near_identical_queries(mocker):
+    topics._suggestion_cache.clear()
+    app.dependency_overrides[get_gemini_api_key] = lambda: "test-key"
+    mock_genai_client = MagicMock()
+    mocker.patch("api.topics.get_genai_client", return_value=mock_genai_client)
+    mock_genai_client.aio.models.generate_content = AsyncMock()
+    mock_genai_client.aio.models.generate_content.return_value.text = "Space, Robotics"
+
+    first = client.post(
+        "/api/topics/suggest", json={"query": "Tech!", "interests": ["AI", "ai."]}
+    )
+    second = client.post("/api/topics/suggest", json={"query": "  tech ", "interests": ["ai"]})
+    assert second.json() == first.json()
+    mock_genai_client.aio.models.generate_content.assert_awaited_once()
+
+    app.dependency_overrides.pop(get_gemini_api_key)
+    topics._suggestion_cache.clear()
@@ -8,7 +8,7 @@ def test_create_user_new_user(test_client, mocker):
     client, mock_db_client = test_client
     mock_users_collection = MagicMock()
     mock_db_client.users = mock_users_collection
-    mock_users_collection.find_one.return_value = None  # No user found by id or email
+    mock_users_collection.find.return_value = []  # No user found by id or email
 
     # Mock the get_current_user dependency
     mock_user = User(sub="new_user_sub", email="new@example.com", name="New User")
@@ -34,11 +34,7 @@ def test_create_user_existing_user_by_id(test_client, mocker):
     mock_db_client.users = mock_users_collection
 
     # User is found by user_id
-    mock_users_collection.find_one.return_value = {
-        "user_id": "existing_sub",
-        "email": "existing@example.com",
-        "topics": ["old_topic"],
-    }
+    mock_users_collection.find.return_value = [{"user_id": "existing_sub"}]
 
     # Mock the get_current_user dependency
     mock_user = User(sub="existing_sub", email="existing@example.com", name="Existing User")
@@ -64,11 +60,8 @@ def test_create_user_existing_user_by_email_migration(test_client, mocker):
     mock_users_collection = MagicMock()
     mock_db_client.users = mock_users_collection
 
-    # First find_one (by id) returns None, second find_one (by email) returns the user
-    mock_users_collection.find_one.side_effect = [
-        None,
-        {"email": "legacy@example.com", "topics": ["old_topic"]},
-    ]
+    # Only the legacy document without a user_id matches (by email)
+    mock_users_collection.find.return_value = [{}]
 
     # Mock the get_current_user dependency
     mock_user = User(sub="new_sub_for_legacy_user", email="legacy@example.com", name="Legacy User")
@@ -84,6 +77,11 @@ def test_create_user_existing_user_by_email_migration(test_client, mocker):
     update_data = mock_users_collection.update_one.call_args[0][1]
     assert update_filter["email"] == "legacy@example.com"
     assert update_data["$set"]["user_id"] == "new_sub_for_legacy_user"
+    mock_users_collection.find.assert_called_once()
+    lookup_filter = mock_users_collection.find.call_args[0][0]
+    assert lookup_filter == {
+        "$or": [{"user_id": "new_sub_for_legacy_user"}, {"email": "legacy@example.com"}]
+    }
 
     # Clean up dependency override
     app.dependency_overrides = {}
@@ -210,3 +208,32 @@ def test_update_user_multiple_preferences_separately(test_client, mocker):
     assert "preferences.newsletter_frequency" in call2_update
     # The key point: this doesn't contain newsletter_format, so it won't overwrite it
     assert "preferences.newsletter_format" not in call2_update
+
+
+def test_get_user_links_account_by_email(test_client, mocker):
+    client, mock_db_client = test_client
+    mock_users_collection = MagicMock()
+    mock_db_client.users = mock_users_collection
+    mock_users_collection.find_one.return_value = None  # Not found by user_id
+    mock_users_collection.find_one_and_update.return_value = {
+        "user_id": "oauth_sub",
+        "email": "linked@example.com",
+        "topics": ["tech"],
+    }
+
+    mock_user = User(
+        sub="oauth_sub",
+        email="linked@example.com",
+        iss="https://accounts.google.com",
+    )
+    app.dependency_overrides[get_current_user] = lambda: mock_user
+
+    response = client.get("/api/users/oauth_sub")
+    assert response.status_code == 200
+    assert response.json()["user_id"] == "oauth_sub"
+    mock_users_collection.find_one.assert_called_once()
+    link_filter, link_update = mock_users_collection.find_one_and_update.call_args[0]
+    assert link_filter == {"email": "linked@example.com"}
+    assert link_update["$set"]["oauth_provider"] == "google"
+
+    app.dependency_overrides = {}
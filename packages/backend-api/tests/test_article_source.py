@@ -0,0 +1,28 @@
+from shared.articles import article_summary_projection, derive_source
+
+
+def test_derive_source_keeps_explicit_source():
+    assert derive_source({"source": "intelligent_crawler", "link": "https://www.bbc.co.uk/x"}) == (
+        "intelligent_crawler"
+    )
+
+
+def test_derive_source_uses_link_domain_for_rss():
+    assert derive_source({"source": "rss", "link": "https://www.theverge.com/a"}) == "Theverge"
+    assert derive_source({"link": "https://techcrunch.com/b"}) == "Techcrunch"
+
+
+def test_derive_source_without_link():
+    assert derive_source({"source": "rss"}) == "RSS"
+    assert derive_source({"link": "not-a-url"}) == "RSS"
+
+
+def test_derive_source_accepts_renamed_summary():
+    assert derive_source({"source": "rss", "url": "https://www.wired.com/c"}) == "Wired"
+
+
+def test_article_summary_projection_renames_fields():
+    projection = article_summary_projection("article.")
+    assert projection["description"] == "$article.summary"
+    assert projection["url"] == "$article.link"
+    assert projection["published_at"] == "$article.published"
@@ -0,0 +1,92 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from shared.cache import SingleFlight, TTLCache, normalize_prompt
+
+
+def test_ttl_cache_returns_value_before_expiry():
+    cache = TTLCache(ttl=60)
+    cache.set("key", "value")
+    assert cache.get("key") == "value"
+
+
+def test_ttl_cache_expires_entries(mocker):
+    cache = TTLCache(ttl=10)
+    mocker.patch("shared.cache.time.monotonic", return_value=100.0)
+    cache.set("key", "value")
+
+    mocker.patch("shared.cache.time.monotonic", return_value=111.0)
+    assert cache.get("key") is None
+    assert cache.get("key", "fallback") == "fallback"
+
+
+def test_ttl_cache_evicts_least_recently_used_beyond_maxsize():
+    cache = TTLCache(ttl=60, maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_is_safe_across_threads():
+    cache = TTLCache(ttl=60, maxsize=8)
+
+    def churn(offset):
+        for i in range(2000):
+            cache.set((offset + i) % 16, i)
+            cache.get((offset + i + 1) % 16)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(churn, range(8)))
+    assert len(cache._entries) <= 8
+
+
+def test_ttl_cache_clear():
+    cache = TTLCache(ttl=60)
+    cache.set("key", "value")
+    cache.clear()
+    assert cache.get("key") is None
+
+
+def test_normalize_prompt_ignores_case_punctuation_and_spacing():
+    assert normalize_prompt("  What's new in   AI? ") == normalize_prompt("whats new in ai")
+    assert normalize_prompt("C++ news") != normalize_prompt("C news")
+
+
+def test_single_flight_shares_concurrent_calls():
+    flight = SingleFlight()
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def run():
+        return await asyncio.gather(*(flight.do("key", call) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["result"] * 5
+    assert len(calls) == 1
+    assert flight._inflight == {}
+
+
+def test_single_flight_propagates_errors_to_every_caller():
+    flight = SingleFlight()
+
+    async def call():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def run():
+        return await asyncio.gather(
+            flight.do("key", call), flight.do("key", call), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, ValueError) for result in results)
+    with pytest.raises(ValueError):
+        asyncio.run(flight.do("key", call))
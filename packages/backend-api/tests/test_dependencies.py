@@ -0,0 +1,58 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import dependencies
+from pymongo.errors import OperationFailure, ServerSelectionTimeoutError
+
+
+def test_gemini_api_key_is_cached_after_key_vault_fetch(mocker, monkeypatch):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    dependencies._secret_cache.clear()
+    kv_client = MagicMock()
+    kv_client.get_secret.return_value = "vault-key"
+    mocker.patch("dependencies.get_key_vault_client", return_value=kv_client)
+
+    assert dependencies.get_gemini_api_key() == "vault-key"
+    assert dependencies.get_gemini_api_key() == "vault-key"
+
+    kv_client.get_secret.assert_called_once_with("UP2D8-GEMINI-API-KEY")
+    dependencies._secret_cache.clear()
+
+
+def test_gemini_api_key_fetched_once_under_concurrent_requests(mocker, monkeypatch):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    dependencies._secret_cache.clear()
+    kv_client = MagicMock()
+
+    def slow_get_secret(name):
+        time.sleep(0.05)
+        return "vault-key"
+
+    kv_client.get_secret.side_effect = slow_get_secret
+    mocker.patch("dependencies.get_key_vault_client", return_value=kv_client)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        keys = list(executor.map(lambda _: dependencies.get_gemini_api_key(), range(8)))
+
+    assert keys == ["vault-key"] * 8
+    kv_client.get_secret.assert_called_once_with("UP2D8-GEMINI-API-KEY")
+    dependencies._secret_cache.clear()
+
+
+def test_ensure_indexes_stops_when_database_unreachable():
+    db = MagicMock()
+    db.__getitem__.return_value.create_index.side_effect = ServerSelectionTimeoutError("down")
+
+    dependencies.ensure_indexes(db)
+
+    assert db.__getitem__.return_value.create_index.call_count == 1
+
+
+def test_ensure_indexes_continues_past_other_failures():
+    db = MagicMock()
+    db.__getitem__.return_value.create_index.side_effect = OperationFailure("bad index")
+
+    dependencies.ensure_indexes(db)
+
+    assert db.__getitem__.return_value.create_index.call_count == len(dependencies.MONGO_INDEXES)
@@ -15,6 +15,21 @@ from shared.logger_config import configure_logger
 configure_logger()
 logger = structlog.get_logger()
 
+# Number of leading lines of article text used as the summary
+SUMMARY_LINES = 15
+
+def _summarize(article_text: str) -> str:
+    """Join the first SUMMARY_LINES lines of the text into a one-line summary."""
+    # Scan for the end of the summary lines and split only that prefix, rather
+    # than splitting the whole (often very long) article into lines
+    end = -1
+    for _ in range(SUMMARY_LINES):
+        end = article_text.find('\n', end + 1)
+        if end == -1:
+            break
+    head = article_text if end == -1 else article_text[:end]
+    return ' '.join(head.splitlines()[:SUMMARY_LINES]) + '...'
+
 async def main(msg: func.QueueMessage) -> None:
     """
     Worker function to crawl a single URL received from a queue message.
@@ -68,14 +83,14 @@ async def main(msg: func.QueueMessage) -> None:
         if not article_text:
             article_text = soup.get_text(separator='\n', strip=True) # Fallback to all text
 
-        summary = ' '.join(article_text.splitlines()[:15]) + '...' # Create a summary
+        summary = _summarize(article_text)
 
         # --- 4. Store Article via Backend API ---
         article_data = {
             'title': title.strip(),
             'link': url,
             'summary': summary,
-            'published': datetime.datetime.utcnow().isoformat(),
+            'published': datetime.datetime.now(datetime.UTC).isoformat(),
             'tags': [],  # TODO: Add AI-based tagging for crawled articles
             'source': 'intelligent_crawler',
             'content': article_text  # Full content for future use
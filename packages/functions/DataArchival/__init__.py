@@ -1,8 +1,7 @@
 import azure.functions as func
 from datetime import datetime, timedelta, UTC
-import pymongo
 from dotenv import load_dotenv
-from shared.key_vault_client import get_secret_client
+from shared.mongo_client import get_mongo_client
 from shared.backend_client import BackendAPIClient
 import structlog
 from shared.logger_config import configure_logger
@@ -19,7 +18,7 @@ def main(timer: func.TimerRequest) -> None:
 
     Performs:
     - Archives processed articles older than 90 days
-    - Deletes old analytics events older than 180 days
+    - Rolls up analytics events older than 180 days into daily counts, then deletes them
     - Logs archival metrics to backend analytics
     """
     load_dotenv()
@@ -27,11 +26,9 @@ def main(timer: func.TimerRequest) -> None:
 
     try:
         # Initialize clients
-        secret_client = get_secret_client()
         backend_client = BackendAPIClient()
 
-        cosmos_connection = secret_client.get_secret("COSMOS-DB-CONNECTION-STRING-UP2D8").value
-        client = pymongo.MongoClient(cosmos_connection)
+        client = get_mongo_client()
         db = client.up2d8
 
         # --- Archive processed articles older than 90 days ---
@@ -48,6 +45,26 @@ def main(timer: func.TimerRequest) -> None:
         # --- Delete old analytics events (keep 180 days) ---
         analytics_cutoff = datetime.now(UTC) - timedelta(days=180)
 
+        # Fold the expiring events into per-day, per-type counts first so history
+        # survives as a small rollup collection instead of raw events. Counts are
+        # added on merge because a day straddling the cutoff is rolled up across runs.
+        db.analytics.aggregate([
+            {"$match": {"timestamp": {"$lt": analytics_cutoff}}},
+            {"$group": {
+                "_id": {
+                    "date": {"$dateToString": {"format": "%Y-%m-%d", "date": "$timestamp"}},
+                    "event_type": "$event_type"
+                },
+                "count": {"$sum": 1}
+            }},
+            {"$merge": {
+                "into": "analytics_daily_rollup",
+                "whenMatched": [{"$set": {"count": {"$add": ["$count", "$$new.count"]}}}],
+                "whenNotMatched": "insert"
+            }}
+        ])
+        logger.info("Rolled up old analytics events", cutoff=analytics_cutoff.isoformat())
+
         analytics_result = db.analytics.delete_many({
             "timestamp": {"$lt": analytics_cutoff}
         })
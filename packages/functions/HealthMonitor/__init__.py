@@ -3,6 +3,7 @@ import azure.functions as func
 from dotenv import load_dotenv
 from shared.backend_client import BackendAPIClient
 from shared.key_vault_client import get_secret_client
+from shared.mongo_client import get_mongo_client
 import pymongo
 import structlog
 from shared.logger_config import configure_logger
@@ -33,10 +34,11 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
 
     # --- Check 1: Cosmos DB Connection ---
     try:
-        secret_client = get_secret_client()
-        cosmos_connection = secret_client.get_secret("COSMOS-DB-CONNECTION-STRING-UP2D8").value
-        client = pymongo.MongoClient(cosmos_connection, serverSelectionTimeoutMS=5000)
-        client.server_info()  # Will raise exception if can't connect
+        client = get_mongo_client()
+        # The shared client keeps the default 30s server selection timeout;
+        # bound the probe so an unreachable database fails the check quickly
+        with pymongo.timeout(5):
+            client.admin.command("ping")  # Will raise exception if can't connect
         health_status["checks"]["cosmos_db"] = "connected"
         logger.debug("Cosmos DB health check passed")
     except Exception as e:
@@ -1,23 +1,55 @@
 import os
-import pymongo
-import google.generativeai as genai
+from pymongo import UpdateOne
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue
 import azure.functions as func
 from shared.email_service import EmailMessage, SMTPProvider
 from shared.embeddings_service import EmbeddingsService
 from shared.email_template import get_newsletter_template, get_plain_text_newsletter
 from dotenv import load_dotenv
 from shared.key_vault_client import get_secret_client
+from shared.mongo_client import get_mongo_client
 import structlog
 from shared.logger_config import configure_logger
-from datetime import datetime
+from datetime import UTC, datetime, timedelta
 
 # Configure structlog
 configure_logger()
 logger = structlog.get_logger()
 
-def should_send_newsletter(frequency: str, last_sent: datetime = None) -> bool:
-    """Determine if newsletter should be sent based on frequency."""
-    now = datetime.utcnow()
+# Only the fields the ranking and email templates read. Articles in particular
+# can carry full crawled content, which would otherwise be pulled for the whole
+# week's window on every run.
+USER_FIELDS = {
+    '_id': 0, 'user_id': 1, 'email': 1, 'name': 1,
+    'topics': 1, 'preferences': 1, 'topic_embeddings': 1
+}
+ARTICLE_FIELDS = {
+    '_id': 0, 'id': 1, 'title': 1, 'summary': 1,
+    'link': 1, 'url': 1, 'published': 1, 'created_at': 1
+}
+
+# The recent-article window is consumed whole, so fetch it in large batches to
+# save getMore round-trips
+ARTICLE_BATCH_SIZE = 1000
+
+# Subject line for each newsletter frequency
+NEWSLETTER_SUBJECTS = {
+    'daily': 'Your Daily News Digest',
+    'weekly': 'Your Weekly News Digest',
+    'monthly': 'Your Monthly News Digest'
+}
+
+# Number of SMTP sessions delivering newsletters in parallel
+EMAIL_SEND_WORKERS = 4
+
+def should_send_newsletter(frequency: str, last_sent: datetime = None, now: datetime = None) -> bool:
+    """Determine if newsletter should be sent based on frequency.
+
+    Pass ``now`` to evaluate every user of a run against the same clock reading.
+    """
+    now = now or datetime.now(UTC)
 
     if frequency == "daily":
         return True  # Always send on daily schedule
@@ -30,6 +62,168 @@ def should_send_newsletter(frequency: str, last_sent: datetime = None) -> bool:
     else:
         return True  # Default to daily
 
+def _is_recipient(user: dict, now: datetime) -> bool:
+    """Whether a user should get a newsletter in the run started at ``now``."""
+    user_email = user.get('email')
+
+    if not user.get('user_id'):
+        logger.warning("User missing user_id", user_email=user_email)
+        return False
+
+    user_preferences = user.get('preferences', {})
+    newsletter_frequency = user_preferences.get('newsletter_frequency', 'daily')
+
+    # Check if user has email notifications enabled
+    if not user_preferences.get('email_notifications', True):
+        logger.info("Email notifications disabled for user", user_email=user_email)
+        return False
+
+    # Check if newsletter should be sent based on frequency
+    if not should_send_newsletter(newsletter_frequency, now=now):
+        logger.info("Skipping user due to frequency setting",
+                   user_email=user_email,
+                   frequency=newsletter_frequency)
+        return False
+
+    # Without topics there is nothing to rank against, so skip the
+    # sent-article lookup and embedding work for this user entirely
+    if not user.get('topics'):
+        logger.info("No topics configured for user", user_email=user_email)
+        return False
+
+    return True
+
+def _delivery_worker(smtp_provider: SMTPProvider, user_articles_collection, newsletters: Queue) -> tuple:
+    """
+    Send queued (user_id, email_message, articles) newsletters over one SMTP session
+    until a None sentinel is queued, recording each sent newsletter's articles.
+
+    Returns the (sent, failed) newsletter counts.
+    """
+    # Newsletters handed to send_batch whose result hasn't come back yet, in order
+    in_flight = deque()
+
+    def queued_messages():
+        for newsletter in iter(newsletters.get, None):
+            in_flight.append(newsletter)
+            yield newsletter[1]
+
+    sent_count = 0
+    failed_count = 0
+    for sent in smtp_provider.send_batch(queued_messages()):
+        user_id, email_message, articles = in_flight.popleft()
+        if not sent:
+            failed_count += 1
+            logger.error("Failed to send newsletter", user_email=email_message.to)
+            continue
+
+        sent_count += 1
+        logger.info("Newsletter sent",
+                  user_email=email_message.to,
+                  article_count=len(articles))
+        _record_sent_articles(user_articles_collection, user_id, articles)
+
+    return sent_count, failed_count
+
+def _collect_delivery_counts(workers: list) -> tuple:
+    """
+    Total the (sent, failed) counts of finished delivery worker futures.
+
+    A failed worker only loses its own counts; the others' sends still get
+    reported.
+    """
+    sent_count = 0
+    failed_count = 0
+    for worker in workers:
+        try:
+            sent, failed = worker.result()
+        except Exception as e:
+            logger.error("Newsletter delivery worker failed", error=str(e))
+            continue
+        sent_count += sent
+        failed_count += failed
+    return sent_count, failed_count
+
+def _record_sent_articles(user_articles_collection, user_id: str, articles: list) -> None:
+    """Mark a newsletter's articles as sent to the user in a single bulk write."""
+    sent_at = datetime.now(UTC)
+    tracking_ops = [
+        UpdateOne(
+            {
+                'user_id': user_id,
+                'article_id': article['id']
+            },
+            {
+                '$set': {
+                    'sent_in_newsletter': True,
+                    'sent_at': sent_at
+                },
+                '$setOnInsert': {
+                    'user_id': user_id,
+                    'article_id': article['id'],
+                    'read': False,
+                    'bookmarked': False,
+                    'created_at': sent_at
+                }
+            },
+            upsert=True
+        )
+        for article in articles
+        if article.get('id')
+    ]
+    if tracking_ops:
+        try:
+            # Unordered so one failed upsert doesn't stop the rest
+            user_articles_collection.bulk_write(tracking_ops, ordered=False)
+        except Exception as e:
+            logger.error("Failed to track articles for user",
+                       user_id=user_id,
+                       article_count=len(tracking_ops),
+                       error=str(e))
+
+def _refresh_topic_embeddings(embeddings_service: EmbeddingsService, users_collection, users: list) -> dict:
+    """
+    Embed the topics of every user whose cached topic embeddings are missing or
+    stale, returning the fresh embeddings keyed by user_id.
+
+    All stale users' topics go out in one batched embedding request (topics that
+    several users share are embedded once) and are saved back in one bulk write,
+    rather than an API call and an update per user inside the send loop.
+    """
+    stale_users = [
+        user for user in users
+        if not user.get('topic_embeddings')
+        or len(user['topic_embeddings']) != len(user.get('topics', []))
+    ]
+    if not stale_users:
+        return {}
+
+    logger.info("Generating topic embeddings", user_count=len(stale_users))
+    all_topics = [topic for user in stale_users for topic in user.get('topics', [])]
+    embeddings = embeddings_service.generate_embeddings_batch(all_topics)
+
+    refreshed = {}
+    offset = 0
+    for user in stale_users:
+        topic_count = len(user.get('topics', []))
+        refreshed[user['user_id']] = [
+            emb for emb in embeddings[offset:offset + topic_count] if emb
+        ]
+        offset += topic_count
+
+    # Cache embeddings in the user documents
+    update_ops = [
+        UpdateOne({'user_id': user_id}, {'$set': {'topic_embeddings': topic_embeddings}})
+        for user_id, topic_embeddings in refreshed.items()
+        if topic_embeddings
+    ]
+    if update_ops:
+        try:
+            users_collection.bulk_write(update_ops, ordered=False)
+        except Exception as e:
+            logger.error("Failed to cache topic embeddings", user_count=len(update_ops), error=str(e))
+    return refreshed
+
 def main(timer: func.TimerRequest) -> None:
     load_dotenv()
     logger.info('Python timer trigger function ran', past_due=timer.past_due)
@@ -39,7 +233,6 @@ def main(timer: func.TimerRequest) -> None:
         # Get configuration from environment variables and Key Vault
         secret_client = get_secret_client()
 
-        cosmos_db_connection_string = secret_client.get_secret("COSMOS-DB-CONNECTION-STRING-UP2D8").value
         gemini_api_key = secret_client.get_secret("UP2D8-GEMINI-API-Key").value
         brevo_smtp_user = os.environ["BREVO_SMTP_USER"]
         brevo_smtp_password = secret_client.get_secret("UP2D8-SMTP-KEY").value
@@ -47,10 +240,6 @@ def main(timer: func.TimerRequest) -> None:
         brevo_smtp_port = int(os.environ["BREVO_SMTP_PORT"])
         sender_email = os.environ["SENDER_EMAIL"]
 
-        # Configure Gemini API
-        genai.configure(api_key=gemini_api_key)
-        model = genai.GenerativeModel('gemini-2.5-flash')
-
         # Initialize embeddings service for semantic search
         embeddings_service = EmbeddingsService(api_key=gemini_api_key)
 
@@ -62,210 +251,192 @@ def main(timer: func.TimerRequest) -> None:
             smtp_password=brevo_smtp_password
         )
 
-        # Connect to Cosmos DB
-        client = pymongo.MongoClient(cosmos_db_connection_string)
+        # Connect to Cosmos DB through the worker's shared client
+        client = get_mongo_client()
         db = client.up2d8
         users_collection = db.users
         articles_collection = db.articles
         user_articles_collection = db.user_articles
 
-        # Fetch users and all unsent articles (not limited by 'processed' flag)
-        users = list(users_collection.find())
+        # One clock reading per run, shared by the article window and the
+        # per-user frequency checks
+        run_started_at = datetime.now(UTC)
+
+        # Fetch users and work out who gets a newsletter this run before loading
+        # articles; on days nobody is due, the article scan and embedding calls
+        # are skipped entirely
+        users = list(users_collection.find({}, USER_FIELDS))
+        recipients = [user for user in users if _is_recipient(user, run_started_at)]
+
+        if not recipients:
+            logger.info("No users due a newsletter.", total_users=len(users))
+            return
+
         # Get recent articles (e.g., from last 7 days) instead of using 'processed' flag
-        from datetime import timedelta
-        week_ago = datetime.utcnow() - timedelta(days=7)
-        articles = list(articles_collection.find({
-            'created_at': {'$gte': week_ago}
-        }))
+        week_ago = run_started_at - timedelta(days=7)
+        articles = list(
+            articles_collection.find({
+                'created_at': {'$gte': week_ago}
+            }, ARTICLE_FIELDS)
+            .batch_size(ARTICLE_BATCH_SIZE)
+        )
 
         if not articles:
             logger.info("No new articles to process.")
             return
 
-        sent_newsletters_count = 0
-        for user in users:
+        # Load every user's sent history for this run's articles in one query,
+        # rather than one user_articles query per recipient inside the loop
+        sent_article_ids_by_user = {}
+        sent_user_articles = user_articles_collection.find({
+            'user_id': {'$in': [user['user_id'] for user in recipients]},
+            'article_id': {'$in': [article['id'] for article in articles if article.get('id')]},
+            'sent_in_newsletter': True
+        }, {'_id': 0, 'user_id': 1, 'article_id': 1})
+        for ua in sent_user_articles:
+            sent_article_ids_by_user.setdefault(ua['user_id'], set()).add(ua.get('article_id'))
+
+        # Articles every recipient has already received can't be picked for anyone,
+        # so drop them before paying for embeddings; stop if nothing is left
+        sent_to_all = set.intersection(
+            *(sent_article_ids_by_user.get(user['user_id'], set()) for user in recipients)
+        )
+        articles = [a for a in articles if a.get('id') not in sent_to_all]
+
+        if not articles:
+            logger.info("All recent articles already sent to every recipient.")
+            return
+
+        # Article embeddings are the same for every user, so compute them once
+        # per run instead of re-embedding each article for every recipient
+        article_embeddings = embeddings_service.generate_article_embeddings(articles)
+        logger.info("Generated article embeddings",
+                   embedded_count=len(article_embeddings),
+                   article_count=len(articles),
+                   cache_hits=embeddings_service.cache_hits,
+                   cache_misses=embeddings_service.cache_misses)
+
+        topic_embeddings_by_user = _refresh_topic_embeddings(
+            embeddings_service, users_collection, recipients
+        )
+
+        # Newsletters are queued for a few delivery workers, each holding one SMTP
+        # session for the whole run, so the connect/TLS/login handshake is paid once
+        # per worker rather than once per email. Ranking and rendering stay on this
+        # thread, so the next newsletter is built while earlier ones are in flight.
+        newsletters = Queue()
+        with ThreadPoolExecutor(max_workers=EMAIL_SEND_WORKERS) as executor:
+            workers = [
+                executor.submit(_delivery_worker, smtp_provider, user_articles_collection, newsletters)
+                for _ in range(EMAIL_SEND_WORKERS)
+            ]
             try:
-                user_id = user.get('user_id')
-                user_email = user.get('email')
-
-                if not user_id:
-                    logger.warning("User missing user_id", user_email=user_email)
-                    continue
-
-                # Get user topics and preferences (new schema)
-                user_topics = user.get('topics', [])
-                user_preferences = user.get('preferences', {})
-
-                # Get newsletter settings
-                newsletter_format = user_preferences.get('newsletter_format', 'concise')
-                newsletter_frequency = user_preferences.get('newsletter_frequency', 'daily')
-                email_notifications = user_preferences.get('email_notifications', True)
-
-                # Check if user has email notifications enabled
-                if not email_notifications:
-                    logger.info("Email notifications disabled for user", user_email=user_email)
-                    continue
-
-                # Check if newsletter should be sent based on frequency
-                if not should_send_newsletter(newsletter_frequency):
-                    logger.info("Skipping user due to frequency setting",
-                               user_email=user_email,
-                               frequency=newsletter_frequency)
-                    continue
-
-                # Get articles already sent to this user
-                sent_article_ids = set()
-                user_articles = user_articles_collection.find({
-                    'user_id': user_id,
-                    'sent_in_newsletter': True
-                }, {'article_id': 1})
-                for ua in user_articles:
-                    sent_article_ids.add(ua.get('article_id'))
-
-                # Filter out already-sent articles
-                unsent_articles = [a for a in articles if a.get('id') not in sent_article_ids]
-
-                if not unsent_articles:
-                    logger.info("No unsent articles for user",
-                              user_email=user_email,
-                              sent_count=len(sent_article_ids))
-                    continue
-
-                # Generate or retrieve topic embeddings
-                # Check if user has topic_embeddings cached in DB
-                topic_embeddings = user.get('topic_embeddings', [])
-
-                # If not cached or topics changed, regenerate
-                if not topic_embeddings or len(topic_embeddings) != len(user_topics):
-                    logger.info("Generating topic embeddings",
-                              user_email=user_email,
-                              topics=user_topics)
-                    topic_embeddings = []
-                    for topic in user_topics:
-                        emb = embeddings_service.generate_embedding(topic)
-                        if emb:
-                            topic_embeddings.append(emb)
-
-                    # Cache embeddings in user document
-                    if topic_embeddings:
-                        users_collection.update_one(
-                            {'user_id': user_id},
-                            {'$set': {'topic_embeddings': topic_embeddings}}
+                for user in recipients:
+                    try:
+                        user_id = user.get('user_id')
+                        user_email = user.get('email')
+
+                        # Get user topics and preferences (new schema)
+                        user_topics = user.get('topics', [])
+                        newsletter_frequency = user.get('preferences', {}).get('newsletter_frequency', 'daily')
+
+                        # Get articles already sent to this user
+                        sent_article_ids = sent_article_ids_by_user.get(user_id, set())
+
+                        # Filter out already-sent articles
+                        unsent_articles = [a for a in articles if a.get('id') not in sent_article_ids]
+
+                        if not unsent_articles:
+                            logger.info("No unsent articles for user",
+                                      user_email=user_email,
+                                      sent_count=len(sent_article_ids))
+                            continue
+
+                        # Topic embeddings cached on the user document, unless
+                        # they were regenerated above because topics changed
+                        topic_embeddings = topic_embeddings_by_user.get(
+                            user_id, user.get('topic_embeddings', [])
                         )
 
-                if not topic_embeddings:
-                    logger.warning("No topic embeddings available for user",
-                                 user_email=user_email)
-                    continue
-
-                # Rank articles by semantic similarity + recency
-                ranked_articles = embeddings_service.rank_articles_by_topics(
-                    articles=unsent_articles,
-                    topic_embeddings=topic_embeddings,
-                    recency_weight=0.3
-                )
-
-                # Filter by minimum similarity threshold and limit to top N
-                MIN_SIMILARITY = 0.3  # Only include articles with >30% similarity
-                MAX_ARTICLES = 15  # Limit newsletter to 15 articles
-
-                relevant_articles = [
-                    article for article, score in ranked_articles
-                    if score >= MIN_SIMILARITY
-                ][:MAX_ARTICLES]
-
-                if not relevant_articles:
-                    logger.info("No semantically relevant articles for user",
-                              user_email=user_email,
-                              topics=user_topics,
-                              unsent_count=len(unsent_articles))
-                    continue
-
-                logger.info("Selected articles for user",
-                          user_email=user_email,
-                          article_count=len(relevant_articles),
-                          top_score=ranked_articles[0][1] if ranked_articles else 0.0)
-
-                # Get user's first name if available
-                user_name = user.get('name', 'there')
-                if user_name and ' ' in user_name:
-                    user_name = user_name.split()[0]  # Get first name only
-
-                # Generate beautiful HTML email with clickable links
-                newsletter_content_html = get_newsletter_template(
-                    articles=relevant_articles,
-                    user_name=user_name
-                )
-
-                # Generate plain text version for email clients that don't support HTML
-                newsletter_content_text = get_plain_text_newsletter(
-                    articles=relevant_articles,
-                    user_name=user_name
-                )
-
-                # Determine subject line based on frequency
-                subject_map = {
-                    'daily': 'Your Daily News Digest',
-                    'weekly': 'Your Weekly News Digest',
-                    'monthly': 'Your Monthly News Digest'
-                }
-                subject = subject_map.get(newsletter_frequency, 'Your News Digest')
-
-                # Create and send email
-                email_message = EmailMessage(
-                    to=user['email'],
-                    subject=subject,
-                    html_body=newsletter_content_html,
-                    text_body=newsletter_content_text,
-                    from_email=sender_email
-                )
+                        if not topic_embeddings:
+                            logger.warning("No topic embeddings available for user",
+                                         user_email=user_email)
+                            continue
+
+                        # Rank articles by semantic similarity + recency
+                        ranked_articles = embeddings_service.rank_articles_by_topics(
+                            articles=unsent_articles,
+                            topic_embeddings=topic_embeddings,
+                            recency_weight=0.3,
+                            article_embeddings=article_embeddings
+                        )
+
+                        # Filter by minimum similarity threshold and limit to top N
+                        MIN_SIMILARITY = 0.3  # Only include articles with >30% similarity
+                        MAX_ARTICLES = 15  # Limit newsletter to 15 articles
+
+                        relevant_articles = [
+                            article for article, score in ranked_articles
+                            if score >= MIN_SIMILARITY
+                        ][:MAX_ARTICLES]
+
+                        if not relevant_articles:
+                            logger.info("No semantically relevant articles for user",
+                                      user_email=user_email,
+                                      topics=user_topics,
+                                      unsent_count=len(unsent_articles))
+                            continue
+
+                        logger.info("Selected articles for user",
+                                  user_email=user_email,
+                                  article_count=len(relevant_articles),
+                                  top_score=ranked_articles[0][1] if ranked_articles else 0.0)
+
+                        # Get user's first name if available
+                        user_name = user.get('name', 'there')
+                        if user_name and ' ' in user_name:
+                            user_name = user_name.split()[0]  # Get first name only
+
+                        # Generate beautiful HTML email with clickable links
+                        newsletter_content_html = get_newsletter_template(
+                            articles=relevant_articles,
+                            user_name=user_name
+                        )
+
+                        # Generate plain text version for email clients that don't support HTML
+                        newsletter_content_text = get_plain_text_newsletter(
+                            articles=relevant_articles,
+                            user_name=user_name
+                        )
+
+                        # Determine subject line based on frequency
+                        subject = NEWSLETTER_SUBJECTS.get(newsletter_frequency, 'Your News Digest')
+
+                        # Create and send email
+                        email_message = EmailMessage(
+                            to=user['email'],
+                            subject=subject,
+                            html_body=newsletter_content_html,
+                            text_body=newsletter_content_text,
+                            from_email=sender_email
+                        )
                 
-                # Note: The send_email method in SMTPProvider is not async, so we call it directly.
-                if smtp_provider.send_email(email_message):
-                    sent_newsletters_count += 1
-                    logger.info("Newsletter sent",
-                              user_email=user_email,
-                              article_count=len(relevant_articles))
-
-                    # Mark articles as sent for this user
-                    for article in relevant_articles:
-                        article_id = article.get('id')
-                        if article_id:
-                            try:
-                                user_articles_collection.update_one(
-                                    {
-                                        'user_id': user_id,
-                                        'article_id': article_id
-                                    },
-                                    {
-                                        '$set': {
-                                            'sent_in_newsletter': True,
-                                            'sent_at': datetime.utcnow()
-                                        },
-                                        '$setOnInsert': {
-                                            'user_id': user_id,
-                                            'article_id': article_id,
-                                            'read': False,
-                                            'bookmarked': False,
-                                            'created_at': datetime.utcnow()
-                                        }
-                                    },
-                                    upsert=True
-                                )
-                            except Exception as e:
-                                logger.error("Failed to track article for user",
-                                           user_id=user_id,
-                                           article_id=article_id,
-                                           error=str(e))
-                else:
-                    logger.error("Failed to send newsletter", user_email=user_email)
-
-            except Exception as e:
-                logger.error("Error processing user", user_email=user_email, error=str(e))
+                        # Hand the newsletter to the delivery workers and move on
+                        newsletters.put((user_id, email_message, relevant_articles))
+
+                    except Exception as e:
+                        logger.error("Error processing user", user_email=user_email, error=str(e))
+            finally:
+                # One sentinel per worker ends its session once the queue drains
+                for _ in workers:
+                    newsletters.put(None)
+
+        sent_newsletters_count, failed_newsletters_count = _collect_delivery_counts(workers)
 
         # No longer need to mark articles as globally processed
         logger.info('Newsletter generation complete',
                    sent_count=sent_newsletters_count,
+                   failed_count=failed_newsletters_count,
                    total_users=len(users))
 
         logger.info('Sent newsletters', count=sent_newsletters_count)
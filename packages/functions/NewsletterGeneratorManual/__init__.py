@@ -1,23 +1,110 @@
 import os
-import pymongo
-import google.generativeai as genai
+import hashlib
+import re
+import threading
 import azure.functions as func
 import markdown
 from shared.email_service import EmailMessage, SMTPProvider
 from dotenv import load_dotenv
 from shared.key_vault_client import get_secret_client
+from shared.mongo_client import get_mongo_client
+from shared.rate_limiter import TokenBucket
 import structlog
 from shared.logger_config import configure_logger
-from datetime import datetime
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
 import json
 
 # Configure structlog
 configure_logger()
 logger = structlog.get_logger()
 
-def should_send_newsletter(frequency: str, last_sent: datetime = None) -> bool:
-    """Determine if newsletter should be sent based on frequency."""
-    now = datetime.utcnow()
+# Gemini prompt for the newsletter body: one line per article, then the ask naming
+# the format. The per-user format goes last so users reading the same articles send
+# an identical prompt prefix, which Gemini's implicit prompt caching can reuse.
+NEWSLETTER_PROMPT_HEADER = "Articles:\n\n"
+NEWSLETTER_PROMPT_ARTICLE = "- **{title}**: {summary}\n"
+NEWSLETTER_PROMPT_ASK = "\nCreate a {newsletter_format} newsletter in Markdown from these articles."
+
+# RSS summaries can run to several KB of markup; the model only needs the gist,
+# and the prompt's input size drives most of the generation latency
+MAX_PROMPT_SUMMARY_CHARS = 500
+
+# Gemini generation requests allowed per minute (the free tier's limit for
+# gemini-2.5-flash by default). Requests beyond it wait for the bucket to refill
+# instead of failing that user's newsletter with a 429.
+GEMINI_REQUESTS_PER_MINUTE = float(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "10"))
+
+_gemini_rate_limiter = TokenBucket(
+    capacity=GEMINI_REQUESTS_PER_MINUTE, rate=GEMINI_REQUESTS_PER_MINUTE / 60
+)
+
+# Newsletter bodies generated by Gemini in parallel
+GEMINI_GENERATION_WORKERS = 4
+
+# Generated newsletter bodies by prompt hash, least recently used first. A prompt
+# is fully determined by the format and the selected articles, so users sharing
+# topics, and re-runs over the same unprocessed articles (e.g. test sends), reuse
+# the earlier generation instead of spending Gemini quota on it again.
+NEWSLETTER_CACHE_SIZE = 256
+_newsletter_cache: "OrderedDict[bytes, str]" = OrderedDict()
+_newsletter_cache_lock = threading.Lock()
+
+# Only the fields the newsletter prompt and settings checks read
+USER_FIELDS = {'_id': 0, 'email': 1, 'topics': 1, 'preferences': 1}
+# Articles keep _id (included by default) for marking them processed afterwards
+ARTICLE_FIELDS = {'title': 1, 'summary': 1, 'created_at': 1}
+
+# Markdown converters, one per thread: constructing one loads its extensions and
+# processor registries, so each is reused and reset() between documents. A
+# Markdown instance keeps per-document state, so concurrent invocations running
+# on the worker's thread pool can't share one.
+_markdown_converters = threading.local()
+
+def _markdown_to_html(text: str) -> str:
+    """Convert Markdown to HTML with this thread's reusable converter."""
+    converter = getattr(_markdown_converters, 'converter', None)
+    if converter is None:
+        converter = _markdown_converters.converter = markdown.Markdown()
+    return converter.reset().convert(text)
+
+def _prompt_key(prompt: str) -> bytes:
+    return hashlib.blake2b(prompt.encode(), digest_size=16).digest()
+
+
+def _generate_newsletter_markdown(model, user_email: str, prompt: str) -> str:
+    """Generate one newsletter body with Gemini, waiting for the rate limiter first.
+
+    Bodies already generated for the same prompt are returned from the cache.
+    """
+    key = _prompt_key(prompt)
+    with _newsletter_cache_lock:
+        cached = _newsletter_cache.get(key)
+        if cached is not None:
+            _newsletter_cache.move_to_end(key)
+    if cached is not None:
+        logger.info("Reusing cached newsletter content", user_email=user_email)
+        return cached
+
+    _gemini_rate_limiter.acquire()
+    logger.info("Generating newsletter with Gemini", user_email=user_email)
+    text = model.generate_content(prompt).text
+
+    if text:
+        with _newsletter_cache_lock:
+            _newsletter_cache[key] = text
+            while len(_newsletter_cache) > NEWSLETTER_CACHE_SIZE:
+                _newsletter_cache.popitem(last=False)
+    return text
+
+
+def should_send_newsletter(frequency: str, last_sent: datetime = None, now: datetime = None) -> bool:
+    """Determine if newsletter should be sent based on frequency.
+
+    Pass ``now`` to evaluate every user of a run against the same clock reading.
+    """
+    now = now or datetime.now(UTC)
 
     if frequency == "daily":
         return True  # Always send on daily schedule
@@ -45,7 +132,6 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
         # Get configuration from environment variables and Key Vault
         secret_client = get_secret_client()
 
-        cosmos_db_connection_string = secret_client.get_secret("COSMOS-DB-CONNECTION-STRING-UP2D8").value
         gemini_api_key = secret_client.get_secret("UP2D8-GEMINI-API-Key").value
         brevo_smtp_user = os.environ["BREVO_SMTP_USER"]
         brevo_smtp_password = secret_client.get_secret("UP2D8-SMTP-KEY").value
@@ -55,7 +141,10 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
 
         logger.info('Configuration loaded successfully')
 
-        # Configure Gemini API
+        # Configure Gemini API. google.generativeai is slow to import, so only
+        # load it when a run actually needs it rather than at function app start-up
+        import google.generativeai as genai
+
         genai.configure(api_key=gemini_api_key)
         model = genai.GenerativeModel('gemini-2.5-flash')
 
@@ -67,8 +156,8 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
             smtp_password=brevo_smtp_password
         )
 
-        # Connect to Cosmos DB
-        client = pymongo.MongoClient(cosmos_db_connection_string)
+        # Connect to Cosmos DB through the worker's shared client
+        client = get_mongo_client()
         db = client.up2d8
         users_collection = db.users
         articles_collection = db.articles
@@ -76,8 +165,8 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
         logger.info('Connected to Cosmos DB')
 
         # Fetch users and unprocessed articles
-        users = list(users_collection.find())
-        articles = list(articles_collection.find({'processed': False}))
+        users = list(users_collection.find({}, USER_FIELDS))
+        articles = list(articles_collection.find({'processed': False}, ARTICLE_FIELDS))
 
         logger.info('Data fetched',
                    total_users=len(users),
@@ -98,9 +187,22 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
                 status_code=200
             )
 
+        # Every user's frequency check uses the same clock reading
+        run_started_at = datetime.now(UTC)
         sent_newsletters_count = 0
+        # Lower-case each article's title and summary once, not per user and topic,
+        # joined with a separator no topic contains so one scan covers both fields.
+        # Newest first, so each topic set's matches come out already in send order.
+        searchable_articles = [
+            (article, f"{article.get('title', '')}\0{article.get('summary', '')}".lower())
+            for article in sorted(articles, key=lambda x: x.get('created_at', ''), reverse=True)
+        ]
+        # (relevant count, top articles) per distinct topic set, for this run only
+        articles_by_topics = {}
         skipped_users = []
         errors = []
+        # (user email, Gemini prompt) for every user who gets a newsletter
+        newsletter_jobs = []
 
         for user in users:
             try:
@@ -136,7 +238,7 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
                     continue
 
                 # Check if newsletter should be sent based on frequency (skip if force=false)
-                if not should_send_newsletter(newsletter_frequency) and not force_send:
+                if not should_send_newsletter(newsletter_frequency, now=run_started_at) and not force_send:
                     reason = f"Frequency setting: {newsletter_frequency}"
                     logger.info("Skipping user due to frequency setting",
                                user_email=user_email,
@@ -144,16 +246,25 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
                     skipped_users.append({"email": user_email, "reason": reason})
                     continue
 
-                # Filter articles based on topics
-                relevant_articles = [a for a in articles if any(topic.lower() in a.get('title', '').lower() or
-                                                                 topic.lower() in a.get('summary', '').lower()
-                                                                 for topic in user_topics)]
+                # Filter articles based on topics. Users with the same topics get
+                # the same selection, so it is computed once per topic set per run.
+                topics_key = frozenset(topic.lower() for topic in user_topics)
+                if topics_key not in articles_by_topics:
+                    # One regex alternation scans each article once for all topics,
+                    # instead of a substring search per topic and field
+                    topics_pattern = re.compile("|".join(map(re.escape, topics_key))) if topics_key else None
+                    relevant_articles = [article for article, text in searchable_articles
+                                         if topics_pattern and topics_pattern.search(text)]
+                    # Limit to top 15 articles to avoid Gemini quota issues
+                    # (most recent first, as searchable_articles is sorted)
+                    articles_by_topics[topics_key] = (len(relevant_articles), relevant_articles[:15])
+                relevant_count, top_articles = articles_by_topics[topics_key]
 
                 logger.info("Articles filtered",
                            user_email=user_email,
-                           relevant_count=len(relevant_articles))
+                           relevant_count=relevant_count)
 
-                if not relevant_articles:
+                if not top_articles:
                     reason = f"No articles matching topics: {user_topics}"
                     logger.info("No relevant articles for user",
                                user_email=user_email,
@@ -161,54 +272,89 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
                     skipped_users.append({"email": user_email, "reason": reason})
                     continue
 
-                # Limit to top 15 articles to avoid Gemini quota issues
-                # Take most recent articles first
-                relevant_articles_sorted = sorted(relevant_articles, key=lambda x: x.get('created_at', ''), reverse=True)
-                top_articles = relevant_articles_sorted[:15]
-
                 logger.info("Articles limited for newsletter",
                            user_email=user_email,
-                           total_relevant=len(relevant_articles),
+                           total_relevant=relevant_count,
                            sending_to_gemini=len(top_articles))
 
                 # Generate newsletter content with Gemini
-                prompt = f"Create a {newsletter_format} newsletter in Markdown from these articles:\n\n"
-                for article in top_articles:
-                    prompt += f"- **{article['title']}**: {article['summary']}\n"
-
-                logger.info("Generating newsletter with Gemini", user_email=user_email)
-
-                newsletter_content_markdown = ""
-                try:
-                    response = model.generate_content(prompt)
-                    newsletter_content_markdown = response.text
-                    logger.info("Newsletter generated successfully", user_email=user_email)
-                except Exception as e:
-                    error_msg = f"Gemini API error: {str(e)}"
-                    logger.error(error_msg, user_email=user_email, error=str(e))
-                    errors.append({"email": user_email, "error": error_msg})
-                    continue
-
-                if not newsletter_content_markdown:
-                    error_msg = "Gemini returned empty content"
-                    logger.warning(error_msg, user_email=user_email)
-                    errors.append({"email": user_email, "error": error_msg})
-                    continue
-
-                # Convert Markdown to HTML
-                newsletter_content_html = markdown.markdown(newsletter_content_markdown)
-
-                # Create and send email
-                email_message = EmailMessage(
-                    to=user_email,
-                    subject='Your Daily News Digest',
-                    html_body=newsletter_content_html,
-                    from_email=sender_email
-                )
+                prompt = NEWSLETTER_PROMPT_HEADER + "".join(
+                    NEWSLETTER_PROMPT_ARTICLE.format(
+                        title=article['title'],
+                        summary=(article.get('summary') or '')[:MAX_PROMPT_SUMMARY_CHARS]
+                    )
+                    for article in top_articles
+                ) + NEWSLETTER_PROMPT_ASK.format(newsletter_format=newsletter_format)
+                newsletter_jobs.append((user_email, prompt))
 
-                logger.info("Sending email", user_email=user_email)
+            except Exception as e:
+                error_msg = f"Processing error: {str(e)}"
+                logger.error(error_msg, user_email=user_email, error=str(e))
+                errors.append({"email": user_email, "error": error_msg})
 
-                if smtp_provider.send_email(email_message):
+        # Each generation is an independent Gemini round-trip, so run several at
+        # once (still paced by the rate limiter) and send each newsletter as soon
+        # as it and the ones before it are ready
+        with ThreadPoolExecutor(max_workers=GEMINI_GENERATION_WORKERS) as executor:
+            # Users whose prompts are identical share a single generation
+            generations_by_prompt = {}
+            generations = []
+            for user_email, prompt in newsletter_jobs:
+                key = _prompt_key(prompt)
+                if key not in generations_by_prompt:
+                    generations_by_prompt[key] = executor.submit(
+                        _generate_newsletter_markdown, model, user_email, prompt
+                    )
+                generations.append((user_email, generations_by_prompt[key]))
+
+            # Users whose newsletter was handed to send_batch, in send order
+            in_flight = deque()
+
+            def ready_newsletters():
+                """Yield each user's email as soon as its generation is done."""
+                for user_email, generation in generations:
+                    try:
+                        newsletter_content_markdown = ""
+                        try:
+                            newsletter_content_markdown = generation.result()
+                            logger.info("Newsletter generated successfully", user_email=user_email)
+                        except Exception as e:
+                            error_msg = f"Gemini API error: {str(e)}"
+                            logger.error(error_msg, user_email=user_email, error=str(e))
+                            errors.append({"email": user_email, "error": error_msg})
+                            continue
+
+                        if not newsletter_content_markdown:
+                            error_msg = "Gemini returned empty content"
+                            logger.warning(error_msg, user_email=user_email)
+                            errors.append({"email": user_email, "error": error_msg})
+                            continue
+
+                        # Convert Markdown to HTML
+                        newsletter_content_html = _markdown_to_html(newsletter_content_markdown)
+
+                        # Create and send email
+                        email_message = EmailMessage(
+                            to=user_email,
+                            subject='Your Daily News Digest',
+                            html_body=newsletter_content_html,
+                            from_email=sender_email
+                        )
+                    except Exception as e:
+                        error_msg = f"Processing error: {str(e)}"
+                        logger.error(error_msg, user_email=user_email, error=str(e))
+                        errors.append({"email": user_email, "error": error_msg})
+                        continue
+
+                    logger.info("Sending email", user_email=user_email)
+                    in_flight.append(user_email)
+                    yield email_message
+
+            # All newsletters go out over one SMTP session instead of a fresh
+            # connect/TLS/login handshake per user
+            for sent in smtp_provider.send_batch(ready_newsletters()):
+                user_email = in_flight.popleft()
+                if sent:
                     sent_newsletters_count += 1
                     logger.info("Newsletter sent successfully", user_email=user_email)
                 else:
@@ -216,11 +362,6 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
                     logger.error(error_msg, user_email=user_email)
                     errors.append({"email": user_email, "error": error_msg})
 
-            except Exception as e:
-                error_msg = f"Processing error: {str(e)}"
-                logger.error(error_msg, user_email=user_email, error=str(e))
-                errors.append({"email": user_email, "error": error_msg})
-
         # Mark articles as processed (only if not in test mode)
         if not test_email:
             article_ids = [a['_id'] for a in articles]
@@ -229,7 +370,7 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
 
         result = {
             "status": "success",
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": datetime.now(UTC).isoformat(),
             "users_processed": len(users),
             "articles_available": len(articles),
             "newsletters_sent": sent_newsletters_count,
@@ -256,7 +397,7 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
         error_result = {
             "status": "error",
             "message": str(e),
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": datetime.now(UTC).isoformat()
         }
         logger.error('Fatal error in manual newsletter generation', error=str(e))
 
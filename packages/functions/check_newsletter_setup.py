@@ -4,7 +4,7 @@ import os
 import pymongo
 from dotenv import load_dotenv
 from shared.key_vault_client import get_secret_client
-from datetime import datetime
+from datetime import UTC, datetime
 
 load_dotenv()
 
@@ -54,7 +54,7 @@ if unprocessed_articles > 0:
 
 # Check if newsletter should run today
 print("\n3. SCHEDULE CHECK:")
-now = datetime.utcnow()
+now = datetime.now(UTC)
 print(f"   Current UTC time: {now}")
 print(f"   Current day of week: {now.strftime('%A')}")
 print(f"   Newsletter schedule: 9:00 AM UTC daily (cron: 0 0 9 * * *)")
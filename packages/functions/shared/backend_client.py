@@ -1,17 +1,43 @@
 import os
+from functools import lru_cache
+import orjson
 import requests
-from typing import Dict, Any, Optional
+from requests.adapters import HTTPAdapter
+from typing import Dict, Any, List, Optional
 from shared.key_vault_client import get_secret_client
 import structlog
 
 logger = structlog.get_logger()
 
+# Maximum pooled keep-alive connections to the backend; sized to cover the
+# article uploads the orchestrator runs in parallel
+BACKEND_POOL_SIZE = 16
+
+# Most articles the backend accepts in one POST /api/articles/batch request
+ARTICLE_BATCH_SIZE = 100
+
+
+@lru_cache(maxsize=None)
+def get_session() -> requests.Session:
+    """Get or create the HTTP session shared by every BackendAPIClient.
+
+    Reusing one session keeps TCP/TLS connections to the backend alive between
+    calls instead of handshaking again for every request.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=BACKEND_POOL_SIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
 class BackendAPIClient:
     """
     Client for communicating with UP2D8-BACKEND FastAPI service.
 
     Provides methods to:
     - Create articles via POST /api/articles
+    - Create articles in bulk via POST /api/articles/batch
     - Log analytics events via POST /api/analytics
     - Check backend health via GET /api/health
     """
@@ -29,6 +55,8 @@ class BackendAPIClient:
         # secret_client = get_secret_client()
         # self.api_key = secret_client.get_secret("BACKEND-API-KEY").value
 
+        self.session = get_session()
+
         logger.info("BackendAPIClient initialized", base_url=self.base_url)
 
     def create_article(self, article_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -54,9 +82,9 @@ class BackendAPIClient:
             requests.RequestException: If the API request fails
         """
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/api/articles",
-                json=article_data,
+                data=orjson.dumps(article_data),
                 timeout=30,
                 headers={"Content-Type": "application/json"}
             )
@@ -77,6 +105,50 @@ class BackendAPIClient:
             )
             raise
 
+    def create_articles(self, articles: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Post several new articles to the backend API in one request.
+
+        Args:
+            articles: Article dictionaries in the create_article format, at most
+                ARTICLE_BATCH_SIZE of them
+
+        Returns:
+            Dictionary with:
+                - message (str): Result message
+                - created (int): Number of articles newly created
+                - ids (list[str]): IDs of the created articles
+
+        Raises:
+            requests.RequestException: If the API request fails
+        """
+        try:
+            response = self.session.post(
+                f"{self.base_url}/api/articles/batch",
+                # Batches carry up to ARTICLE_BATCH_SIZE articles' summaries and
+                # content; orjson encodes them to bytes several times faster than
+                # the stdlib encoder requests uses for json=
+                data=orjson.dumps({"articles": articles}),
+                timeout=60,
+                headers={"Content-Type": "application/json"}
+            )
+            response.raise_for_status()
+            result = response.json()
+            logger.info(
+                "Article batch API call successful",
+                article_count=len(articles),
+                created=result.get("created")
+            )
+            return result
+        except requests.RequestException as e:
+            logger.error(
+                "Failed to create article batch via API",
+                error=str(e),
+                article_count=len(articles),
+                status_code=getattr(e.response, 'status_code', None)
+            )
+            raise
+
     def log_analytics(
         self,
         event_type: str,
@@ -95,7 +167,7 @@ class BackendAPIClient:
             Response dictionary or None if request fails
         """
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/api/analytics",
                 json={
                     "user_id": user_id,
@@ -130,7 +202,7 @@ class BackendAPIClient:
         Returns error dict if health check fails.
         """
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/api/health",
                 timeout=10
             )
@@ -154,7 +226,7 @@ class BackendAPIClient:
             List of user dictionaries or None if request fails
         """
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/api/users",
                 timeout=10
             )
@@ -172,7 +244,7 @@ class BackendAPIClient:
             List of RSS feed dictionaries or None if request fails
         """
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/api/rss_feeds",
                 timeout=10
             )
@@ -2,14 +2,25 @@ import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import os
-from typing import Optional, List
+from typing import Iterable, Iterator, List, Optional
 import structlog
+from shared.rate_limiter import TokenBucket
 
 logger = structlog.get_logger()
 
+# Sustained sends per second allowed through the SMTP relay, shared by every
+# provider in this worker so concurrent delivery workers can't burst past the
+# relay's throttling; bursts up to the same number go straight through
+SMTP_SEND_RATE = float(os.getenv("SMTP_SEND_RATE", "10"))
+
+_smtp_rate_limiter = TokenBucket(capacity=SMTP_SEND_RATE, rate=SMTP_SEND_RATE)
+
 class EmailMessage:
     """Standard email message structure"""
 
+    # One message is built per recipient per run; slots keep them compact
+    __slots__ = ("to", "subject", "html_body", "text_body", "from_email", "reply_to", "cc", "bcc")
+
     def __init__(
         self,
         to: str,
@@ -36,46 +47,65 @@ class SMTPProvider:
     Supports standard SMTP protocol
     """
 
+    __slots__ = ("smtp_host", "smtp_port", "smtp_username", "smtp_password", "use_tls", "rate_limiter")
+
     def __init__(
         self,
         smtp_host: str,
         smtp_port: int,
         smtp_username: str,
         smtp_password: str,
-        use_tls: bool = True
+        use_tls: bool = True,
+        rate_limiter: Optional[TokenBucket] = None
     ):
         self.smtp_host = smtp_host
         self.smtp_port = smtp_port
         self.smtp_username = smtp_username
         self.smtp_password = smtp_password
         self.use_tls = use_tls
+        self.rate_limiter = rate_limiter or _smtp_rate_limiter
+
+    def _open_connection(self) -> smtplib.SMTP:
+        """Connect to the SMTP server and log in, returning the ready session."""
+        if self.use_tls:
+            server = smtplib.SMTP(self.smtp_host, self.smtp_port)
+            server.starttls()
+        else:
+            server = smtplib.SMTP_SSL(self.smtp_host, self.smtp_port)
+
+        server.login(self.smtp_username, self.smtp_password)
+        return server
+
+    def _build_mime(self, message: EmailMessage) -> MIMEMultipart:
+        """Build the multipart/alternative MIME message for an EmailMessage."""
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = message.subject
+        msg['From'] = message.from_email or self.smtp_username
+        msg['To'] = message.to
+
+        # Add both plain text and HTML parts
+        if message.text_body:
+            text_part = MIMEText(message.text_body, 'plain')
+            msg.attach(text_part)
+
+        html_part = MIMEText(message.html_body, 'html')
+        msg.attach(html_part)
+        return msg
+
+    @staticmethod
+    def _transmit(server: smtplib.SMTP, msg: MIMEMultipart, to: str) -> None:
+        # send_message flattens the MIME tree straight to bytes, rather than
+        # building the whole message as a str for sendmail to re-encode
+        server.send_message(msg, from_addr=msg['From'], to_addrs=[to])
 
     def send_email(self, message: EmailMessage) -> bool:
         """Send email via SMTP"""
         try:
-            # Create message
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = message.subject
-            msg['From'] = message.from_email or self.smtp_username
-            msg['To'] = message.to
-
-            # Add both plain text and HTML parts
-            if message.text_body:
-                text_part = MIMEText(message.text_body, 'plain')
-                msg.attach(text_part)
-
-            html_part = MIMEText(message.html_body, 'html')
-            msg.attach(html_part)
-
-            # Connect and send
-            if self.use_tls:
-                server = smtplib.SMTP(self.smtp_host, self.smtp_port)
-                server.starttls()
-            else:
-                server = smtplib.SMTP_SSL(self.smtp_host, self.smtp_port)
-
-            server.login(self.smtp_username, self.smtp_password)
-            server.sendmail(msg['From'], [message.to], msg.as_string())
+            msg = self._build_mime(message)
+
+            server = self._open_connection()
+            self.rate_limiter.acquire()
+            self._transmit(server, msg, message.to)
             server.quit()
 
             logger.info("email_sent_via_smtp", to=message.to, subject=message.subject)
@@ -84,3 +114,41 @@ class SMTPProvider:
         except Exception as e:
             logger.error("smtp_send_failed", error=str(e), to=message.to)
             return False
+
+    def send_batch(self, messages: Iterable[EmailMessage]) -> Iterator[bool]:
+        """
+        Send several emails over one SMTP session, yielding True/False per message in order.
+
+        The connect + STARTTLS + login handshake costs far more than sending a
+        message, so it is done once per batch rather than once per email. A
+        rejected message only fails that message; if the server drops the
+        connection, the next message reconnects. ``messages`` may be any iterable,
+        including a generator fed from a queue, and is consumed lazily.
+        """
+        server = None
+        try:
+            for message in messages:
+                try:
+                    msg = self._build_mime(message)
+                    if server is None:
+                        server = self._open_connection()
+                    self.rate_limiter.acquire()
+                    try:
+                        self._transmit(server, msg, message.to)
+                    except smtplib.SMTPServerDisconnected:
+                        # Idle sessions get closed server-side; reconnect and retry once
+                        server = self._open_connection()
+                        self._transmit(server, msg, message.to)
+
+                    logger.info("email_sent_via_smtp", to=message.to, subject=message.subject)
+                    sent = True
+                except Exception as e:
+                    logger.error("smtp_send_failed", error=str(e), to=message.to)
+                    sent = False
+                yield sent
+        finally:
+            if server is not None:
+                try:
+                    server.quit()
+                except Exception:
+                    pass
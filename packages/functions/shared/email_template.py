@@ -2,27 +2,9 @@
 Email templates for Up2D8 newsletter
 """
 
-def get_newsletter_template(articles: list, user_name: str = "there") -> str:
-    """
-    Generate a beautiful HTML email template for the newsletter.
-
-    Args:
-        articles: List of article dicts with 'title', 'summary', 'link', 'published'
-        user_name: Name to greet the user with
-
-    Returns:
-        HTML string for the email
-    """
-
-    # Build article HTML
-    articles_html = ""
-    for idx, article in enumerate(articles, 1):
-        title = article.get('title', 'Untitled')
-        summary = article.get('summary', '')
-        link = article.get('link') or article.get('url', '#')
-        published = article.get('published', '')
-
-        articles_html += f"""
+# HTML newsletter pieces, built once at import and filled in with str.format
+# per recipient, mirroring the plain-text templates below
+HTML_ARTICLE_ROW = """
         <tr>
             <td style="padding: 20px 0; border-bottom: 1px solid #e5e7eb;">
                 <table width="100%" cellpadding="0" cellspacing="0" border="0">
@@ -46,7 +28,7 @@ def get_newsletter_template(articles: list, user_name: str = "there") -> str:
                             <a href="{link}" style="display: inline-block; background-color: #3b82f6; color: white; text-decoration: none; padding: 10px 24px; border-radius: 6px; font-size: 14px; font-weight: 500; transition: background-color 0.2s;">
                                 Read Article →
                             </a>
-                            {f'<span style="color: #9ca3af; font-size: 12px; margin-left: 12px;">{published}</span>' if published else ''}
+                            {published_html}
                         </td>
                     </tr>
                 </table>
@@ -54,8 +36,9 @@ def get_newsletter_template(articles: list, user_name: str = "there") -> str:
         </tr>
         """
 
-    # Main template
-    html_template = f"""
+HTML_PUBLISHED_DATE = '<span style="color: #9ca3af; font-size: 12px; margin-left: 12px;">{published}</span>'
+
+HTML_NEWSLETTER = """
     <!DOCTYPE html>
     <html lang="en">
     <head>
@@ -145,47 +128,32 @@ def get_newsletter_template(articles: list, user_name: str = "there") -> str:
     </html>
     """
 
-    return html_template
-
+# Plain-text newsletter pieces, built once at import. Only the greeting and the
+# per-article fields vary between recipients.
+_RULE = '=' * 50
+_DIVIDER = '-' * 50
 
-def get_plain_text_newsletter(articles: list, user_name: str = "there") -> str:
-    """
-    Generate a plain text version of the newsletter for email clients that don't support HTML.
-
-    Args:
-        articles: List of article dicts with 'title', 'summary', 'link'
-        user_name: Name to greet the user with
-
-    Returns:
-        Plain text string for the email
-    """
-
-    text = f"""
+PLAIN_TEXT_HEADER = f"""
 UP2D8 - Your Personalized News Digest
-{'=' * 50}
+{_RULE}
 
-Hello {user_name}!
+Hello {{user_name}}!
 
 Here are your top stories for today, curated based on your interests:
 
 """
 
-    for idx, article in enumerate(articles, 1):
-        title = article.get('title', 'Untitled')
-        summary = article.get('summary', '')
-        link = article.get('link') or article.get('url', '')
-
-        text += f"""
-[{idx}] {title}
-{'-' * 50}
-{summary}
+PLAIN_TEXT_ARTICLE = f"""
+[{{idx}}] {{title}}
+{_DIVIDER}
+{{summary}}
 
-Read more: {link}
+Read more: {{link}}
 
 """
 
-    text += f"""
-{'=' * 50}
+PLAIN_TEXT_FOOTER = f"""
+{_RULE}
 
 Want to dive deeper? Chat with our AI assistant!
 Visit: https://gray-wave-00bdfc60f.3.azurestaticapps.net
@@ -197,4 +165,60 @@ Manage your preferences: https://gray-wave-00bdfc60f.3.azurestaticapps.net/setti
 © 2025 Up2D8. All rights reserved.
 """
 
-    return text
+def get_newsletter_template(articles: list, user_name: str = "there") -> str:
+    """
+    Generate a beautiful HTML email template for the newsletter.
+
+    Args:
+        articles: List of article dicts with 'title', 'summary', 'link', 'published'
+        user_name: Name to greet the user with
+
+    Returns:
+        HTML string for the email
+    """
+
+    # Build article HTML, collecting rows and joining once
+    article_rows = []
+    for idx, article in enumerate(articles, 1):
+        title = article.get('title', 'Untitled')
+        summary = article.get('summary', '')
+        link = article.get('link') or article.get('url', '#')
+        published = article.get('published', '')
+
+        article_rows.append(HTML_ARTICLE_ROW.format(
+            idx=idx,
+            title=title,
+            summary=summary,
+            link=link,
+            published_html=HTML_PUBLISHED_DATE.format(published=published) if published else ''
+        ))
+
+    articles_html = "".join(article_rows)
+
+    return HTML_NEWSLETTER.format(user_name=user_name, articles_html=articles_html)
+
+
+def get_plain_text_newsletter(articles: list, user_name: str = "there") -> str:
+    """
+    Generate a plain text version of the newsletter for email clients that don't support HTML.
+
+    Args:
+        articles: List of article dicts with 'title', 'summary', 'link'
+        user_name: Name to greet the user with
+
+    Returns:
+        Plain text string for the email
+    """
+
+    header = PLAIN_TEXT_HEADER.format(user_name=user_name)
+    article_sections = (
+        PLAIN_TEXT_ARTICLE.format(
+            idx=idx,
+            title=article.get('title', 'Untitled'),
+            summary=article.get('summary', ''),
+            link=article.get('link') or article.get('url', '')
+        )
+        for idx, article in enumerate(articles, 1)
+    )
+
+    return "".join((header, *article_sections, PLAIN_TEXT_FOOTER))
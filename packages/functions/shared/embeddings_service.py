@@ -5,21 +5,72 @@ Provides embeddings generation and cosine similarity calculation
 for topic-based article matching.
 """
 
-import google.generativeai as genai
-from typing import List
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import UTC, datetime
+from typing import Dict, List
 import numpy as np
 import structlog
 
 logger = structlog.get_logger()
 
+# Most embeddings kept in the content-hash cache. Each entry is one float32
+# vector (~3 KB for text-embedding-004), so this bounds the cache to ~30 MB.
+EMBEDDING_CACHE_SIZE = 10000
+
+# Most texts sent in one batchEmbedContents request (the API's limit). Batches are
+# sent one at a time so a failed request only loses its own texts.
+EMBEDDING_BATCH_SIZE = 100
+
+# Embeddings by content hash, least recently used first. Module-level so warm
+# invocations reuse them: the recent-article window is re-ranked on every run
+# and many users share topics, so most texts were already embedded earlier.
+_embedding_cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+_embedding_cache_lock = threading.Lock()
+
 
 class EmbeddingsService:
     """Service for generating embeddings and calculating similarity."""
 
     def __init__(self, api_key: str):
         """Initialize the embeddings service with Gemini API key."""
+        # google.generativeai takes around half a second to import, so load it
+        # when the service is first used rather than at function app start-up
+        import google.generativeai as genai
+
         genai.configure(api_key=api_key)
+        self._genai = genai
         self.model_name = "models/text-embedding-004"
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def _cache_key(self, text: str) -> bytes:
+        """Content hash identifying an embedding of text under this service's model."""
+        return hashlib.blake2b(f"{self.model_name}\0{text}".encode(), digest_size=16).digest()
+
+    def _cache_get(self, key: bytes) -> np.ndarray | None:
+        with _embedding_cache_lock:
+            embedding = _embedding_cache.get(key)
+            if embedding is None:
+                self.cache_misses += 1
+                return None
+            _embedding_cache.move_to_end(key)
+            self.cache_hits += 1
+        return embedding
+
+    @staticmethod
+    def _cache_put(key: bytes, embedding: List[float]) -> np.ndarray:
+        # Stored as float32 arrays, a fraction of the size of a list of floats.
+        # Ranking already computes in float32, so the narrower storage doesn't
+        # change any similarity score.
+        vector = np.asarray(embedding, dtype=np.float32)
+        with _embedding_cache_lock:
+            _embedding_cache[key] = vector
+            _embedding_cache.move_to_end(key)
+            while len(_embedding_cache) > EMBEDDING_CACHE_SIZE:
+                _embedding_cache.popitem(last=False)
+        return vector
 
     def generate_embedding(self, text: str) -> List[float] | None:
         """
@@ -35,17 +86,24 @@ class EmbeddingsService:
             logger.warning("Empty text provided for embedding")
             return None
 
+        key = self._cache_key(text)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached.tolist()
+
         try:
-            result = genai.embed_content(
+            result = self._genai.embed_content(
                 model=self.model_name,
                 content=text,
                 task_type="semantic_similarity"
             )
-            return result['embedding']
         except Exception as e:
             logger.error("Failed to generate embedding", text_preview=text[:100], error=str(e))
             return None
 
+        self._cache_put(key, result['embedding'])
+        return result['embedding']
+
     def generate_embeddings_batch(self, texts: List[str]) -> List[List[float] | None]:
         """
         Generate embeddings for multiple texts in a batch.
@@ -56,9 +114,56 @@ class EmbeddingsService:
         Returns:
             List of embedding vectors (or None for failed embeddings)
         """
-        embeddings = []
-        for text in texts:
-            embeddings.append(self.generate_embedding(text))
+        return [
+            None if embedding is None else embedding.tolist()
+            for embedding in self._embed_batch(texts)
+        ]
+
+    def _embed_batch(self, texts: List[str]) -> List[np.ndarray | None]:
+        """Embed texts as float32 arrays, in order, with None for failed embeddings."""
+        embeddings: List[np.ndarray | None] = [None] * len(texts)
+
+        # Empty strings are rejected by the API, so only send the non-empty ones.
+        # Texts already in the cache are filled in directly; the rest are grouped
+        # by content hash so a text repeated in the batch is embedded once, and
+        # their positions kept to scatter the results back in order.
+        missing: Dict[bytes, List[int]] = {}
+        for i, text in enumerate(texts):
+            if not text or not text.strip():
+                continue
+            key = self._cache_key(text)
+            cached = self._cache_get(key) if key not in missing else None
+            if cached is not None:
+                embeddings[i] = cached
+            else:
+                missing.setdefault(key, []).append(i)
+
+        if not missing:
+            return embeddings
+
+        # Each batch is cached as soon as it returns, so if a later batch fails
+        # the embeddings already paid for are kept for this run and the next
+        pending = list(missing.items())
+        for start in range(0, len(pending), EMBEDDING_BATCH_SIZE):
+            batch = pending[start:start + EMBEDDING_BATCH_SIZE]
+            try:
+                # A list of contents is sent as one batchEmbedContents request
+                # instead of one embedContent round-trip per text
+                result = self._genai.embed_content(
+                    model=self.model_name,
+                    content=[texts[indices[0]] for _, indices in batch],
+                    task_type="semantic_similarity"
+                )
+            except Exception as e:
+                logger.error("Failed to generate embeddings batch",
+                             count=len(pending) - start,
+                             error=str(e))
+                break
+
+            for (key, indices), embedding in zip(batch, result['embedding']):
+                embedding = self._cache_put(key, embedding)
+                for i in indices:
+                    embeddings[i] = embedding
         return embeddings
 
     @staticmethod
@@ -108,11 +213,75 @@ class EmbeddingsService:
 
         return self.cosine_similarity(emb1, emb2)
 
+    @staticmethod
+    def _unit_rows(vectors: List[List[float]] | np.ndarray) -> np.ndarray:
+        """Stack vectors into an L2-normalized float32 matrix (zero vectors stay zero)."""
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+    @staticmethod
+    def article_text(article: dict) -> str:
+        """Text used to embed an article: its title and summary."""
+        return f"{article.get('title', '')} {article.get('summary', '')}"
+
+    def generate_article_embeddings(self, articles: List[dict]) -> Dict[str, np.ndarray]:
+        """
+        Embed a set of articles in one batch.
+
+        The embeddings are ranked against every recipient's topics, so they are
+        converted once into L2-normalized float32 rows of a single matrix rather
+        than left as Python lists to be re-parsed and re-normalized per user.
+
+        Args:
+            articles: List of article dicts (must have 'id', 'title', 'summary')
+
+        Returns:
+            Dict of article id to unit-length embedding vector; failed embeddings
+            are omitted
+        """
+        keyed = [a for a in articles if a.get('id')]
+        embeddings = self._embed_batch([self.article_text(a) for a in keyed])
+        embedded = [
+            (article['id'], embedding)
+            for article, embedding in zip(keyed, embeddings)
+            if embedding is not None
+        ]
+        if not embedded:
+            return {}
+
+        # Stack the cached float32 arrays directly rather than via Python lists
+        matrix = self._unit_rows(np.stack([embedding for _, embedding in embedded]))
+        return {article_id: row for (article_id, _), row in zip(embedded, matrix)}
+
+    @staticmethod
+    def _recency_score(created_at, now: datetime) -> float:
+        """Recency score for an article timestamp (0-1, newer = higher)."""
+        recency_score = 0.5  # Default for missing timestamps
+
+        if created_at:
+            if isinstance(created_at, str):
+                try:
+                    created_at = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+                except ValueError:
+                    pass
+
+            if isinstance(created_at, datetime):
+                # Mongo returns naive datetimes that are already in UTC
+                if created_at.tzinfo is None:
+                    created_at = created_at.replace(tzinfo=UTC)
+                age_hours = (now - created_at).total_seconds() / 3600
+                # Articles decay over 168 hours (7 days)
+                recency_score = max(0.0, 1.0 - (age_hours / 168.0))
+
+        return recency_score
+
     def rank_articles_by_topics(
         self,
         articles: List[dict],
         topic_embeddings: List[List[float]],
-        recency_weight: float = 0.3
+        recency_weight: float = 0.3,
+        article_embeddings: Dict[str, np.ndarray] | None = None
     ) -> List[tuple]:
         """
         Rank articles by semantic similarity to topic embeddings.
@@ -121,6 +290,8 @@ class EmbeddingsService:
             articles: List of article dicts (must have 'title', 'summary', 'created_at')
             topic_embeddings: List of embedding vectors for user topics
             recency_weight: Weight for recency scoring (0-1, default 0.3)
+            article_embeddings: Precomputed embeddings by article id; articles
+                missing from it are embedded on demand
 
         Returns:
             List of (article, score) tuples sorted by descending score
@@ -129,48 +300,39 @@ class EmbeddingsService:
             logger.warning("No topic embeddings provided for ranking")
             return [(a, 0.0) for a in articles]
 
-        ranked = []
-
-        for article in articles:
-            # Generate article embedding from title + summary
-            article_text = f"{article.get('title', '')} {article.get('summary', '')}"
-            article_embedding = self.generate_embedding(article_text)
+        now = datetime.now(UTC)
+        article_embeddings = article_embeddings or {}
 
+        # Use the precomputed embedding when available, otherwise embed title + summary
+        embedded_indices = []
+        embedded_vectors = []
+        for idx, article in enumerate(articles):
+            article_embedding = article_embeddings.get(article.get('id'))
             if article_embedding is None:
-                ranked.append((article, 0.0))
-                continue
-
-            # Calculate max similarity to any topic
-            max_similarity = 0.0
-            for topic_emb in topic_embeddings:
-                similarity = self.cosine_similarity(article_embedding, topic_emb)
-                max_similarity = max(max_similarity, similarity)
-
-            # Calculate recency score (0-1, newer = higher)
-            from datetime import datetime, timedelta
-            created_at = article.get('created_at')
-            recency_score = 0.5  # Default for missing timestamps
-
-            if created_at:
-                if isinstance(created_at, str):
-                    try:
-                        created_at = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                    except:
-                        pass
-
-                if isinstance(created_at, datetime):
-                    age_hours = (datetime.utcnow() - created_at).total_seconds() / 3600
-                    # Articles decay over 168 hours (7 days)
-                    recency_score = max(0.0, 1.0 - (age_hours / 168.0))
+                article_embedding = self.generate_embedding(self.article_text(article))
+            if article_embedding is not None:
+                embedded_indices.append(idx)
+                embedded_vectors.append(article_embedding)
+
+        # Articles that couldn't be embedded keep a score of 0
+        scores = np.zeros(len(articles))
+        if embedded_vectors:
+            # Score every article against every topic in one float32 matrix
+            # product; an article's similarity is that of its best-matching topic
+            similarities = self._unit_rows(embedded_vectors) @ self._unit_rows(topic_embeddings).T
+            max_similarity = np.maximum(similarities.max(axis=1), 0.0)
+            recency_scores = np.fromiter(
+                (self._recency_score(articles[idx].get('created_at'), now) for idx in embedded_indices),
+                dtype=np.float64,
+                count=len(embedded_indices)
+            )
 
             # Combine semantic similarity and recency
-            final_score = (
+            scores[embedded_indices] = (
                 (1 - recency_weight) * max_similarity +
-                recency_weight * recency_score
+                recency_weight * recency_scores
             )
 
-            ranked.append((article, final_score))
-
-        # Sort by score descending
-        ranked.sort(key=lambda x: x[1], reverse=True)
-        return ranked
+        # Sort by score descending; stable so ties keep their input order
+        order = np.argsort(-scores, kind='stable')
+        return [(articles[idx], float(scores[idx])) for idx in order]
@@ -0,0 +1,19 @@
+from functools import lru_cache
+
+import pymongo
+
+from shared.key_vault_client import get_secret_client
+
+
+@lru_cache(maxsize=None)
+def get_mongo_client() -> pymongo.MongoClient:
+    """
+    Get or create the MongoClient shared by every function in this worker.
+
+    MongoClient is thread-safe and owns a connection pool, so one per process is
+    reused across invocations instead of paying the Key Vault lookup, TLS
+    handshake and server discovery on every trigger.
+    """
+    secret_client = get_secret_client()
+    connection_string = secret_client.get_secret("COSMOS-DB-CONNECTION-STRING-UP2D8").value
+    return pymongo.MongoClient(connection_string)
@@ -1,14 +1,110 @@
 import os
-import pymongo
 import feedparser
-from datetime import datetime
-from langchain_community.utilities import GoogleSearchAPIWrapper
+import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
+from functools import lru_cache
+from typing import TYPE_CHECKING
 from shared.key_vault_client import get_secret_client
-from shared.backend_client import BackendAPIClient
+from shared.mongo_client import get_mongo_client
+from shared.backend_client import ARTICLE_BATCH_SIZE, BackendAPIClient
 import structlog
 
+if TYPE_CHECKING:
+    from langchain_community.utilities import GoogleSearchAPIWrapper
+
 logger = structlog.get_logger()
 
+# Number of RSS feeds downloaded in parallel
+RSS_FETCH_WORKERS = 8
+
+# Seconds to wait on a feed server before giving up on that feed
+RSS_FETCH_TIMEOUT = 15
+
+# Number of Google searches run in parallel
+SEARCH_WORKERS = 4
+
+# Number of RSS article batches posted to the backend in parallel
+ARTICLE_CREATE_WORKERS = 4
+
+
+@lru_cache(maxsize=None)
+def _get_feed_session() -> requests.Session:
+    """Get or create the HTTP session used to download RSS feeds.
+
+    feedparser opens a new connection for every URL it fetches; downloading
+    through one pooled session instead keeps connections alive across feeds
+    served from the same host and across runs in the same worker.
+    """
+    session = requests.Session()
+    session.headers["User-Agent"] = feedparser.USER_AGENT
+    adapter = HTTPAdapter(pool_maxsize=RSS_FETCH_WORKERS)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _parse_feed(feed_doc: dict):
+    """Download and parse a single RSS feed, returning None if it fails."""
+    feed_url = feed_doc["url"]
+    logger.info("Parsing RSS feed", url=feed_url, feed_id=feed_doc.get("id"))
+    try:
+        response = _get_feed_session().get(feed_url, timeout=RSS_FETCH_TIMEOUT)
+        response.raise_for_status()
+        # feedparser reads lowercase header names; content-location lets it
+        # resolve relative links against the final (post-redirect) URL
+        response_headers = {name.lower(): value for name, value in response.headers.items()}
+        response_headers["content-location"] = response.url
+        return feedparser.parse(response.content, response_headers=response_headers)
+    except Exception as e:
+        logger.error("Error parsing RSS feed", url=feed_url, error=str(e))
+        return None
+
+
+def _search_topic(search: "GoogleSearchAPIWrapper", topic: str) -> list[str]:
+    """Run the Google search for one topic, returning result links (empty on error)."""
+    logger.info("Searching for articles via Google Search", topic=topic)
+    try:
+        search_results = search.results(f"latest articles about {topic}", num_results=5)
+        return [res["link"] for res in search_results if "link" in res]
+    except Exception as e:
+        logger.error("Error during Google Search for topic", topic=topic, error=str(e))
+        return []
+
+
+def _create_rss_article(backend_client: BackendAPIClient, article_data: dict) -> bool:
+    """Post one RSS article to the backend, returning True if it was newly created."""
+    try:
+        result = backend_client.create_article(article_data)
+        if 'created successfully' in result.get('message', ''):
+            logger.debug("Created article from RSS",
+                       article_title=article_data['title'],
+                       feed_name=article_data['feed_name'])
+            return True
+    except Exception as e:
+        logger.error("Failed to create article from RSS",
+                   article_link=article_data['link'],
+                   feed_id=article_data['feed_id'],
+                   error=str(e))
+    return False
+
+
+def _create_rss_articles(backend_client: BackendAPIClient, articles: list[dict]) -> int:
+    """Post a batch of RSS articles in one request, returning how many were created.
+
+    If the batch is rejected as a whole (e.g. one entry fails validation), fall
+    back to posting its articles one by one so the rest still get stored.
+    """
+    try:
+        return backend_client.create_articles(articles).get('created', 0)
+    except Exception as e:
+        logger.warning("Falling back to per-article RSS uploads",
+                       article_count=len(articles),
+                       error=str(e))
+        return sum(_create_rss_article(backend_client, article_data) for article_data in articles)
+
+
 def find_new_articles() -> list[str]:
     """
     Core orchestration logic to find new articles based on user topics and RSS feeds.
@@ -18,12 +114,11 @@ def find_new_articles() -> list[str]:
         # --- 1. Configuration and Database Connection ---
         secret_client = get_secret_client()
         
-        cosmos_db_connection_string = secret_client.get_secret("COSMOS-DB-CONNECTION-STRING-UP2D8").value
         google_api_key = secret_client.get_secret("GOOGLE-CUSTOM-SEARCH-API").value
         google_cse_id = os.getenv("GOOGLE_CSE_ID")
 
-        # Initialize MongoDB client
-        client = pymongo.MongoClient(cosmos_db_connection_string)
+        # Shared MongoDB client, reused across invocations
+        client = get_mongo_client()
         db = client.up2d8
         users_collection = db.users
         articles_collection = db.articles
@@ -34,53 +129,82 @@ def find_new_articles() -> list[str]:
 
         # --- 2. Process RSS Feeds - Create Articles Directly ---
         logger.info("Processing RSS feeds...")
-        rss_articles_created = 0
 
-        for feed_doc in rss_feeds_collection.find({}):
+        feed_docs = []
+        for feed_doc in rss_feeds_collection.find({}, {"_id": 0, "id": 1, "url": 1, "title": 1}):
+            if not feed_doc.get("url"):
+                logger.warning("RSS feed document missing URL", feed_id=feed_doc.get("id"))
+                continue
+            feed_docs.append(feed_doc)
+
+        # Downloading feeds is network-bound and independent per feed, so fetch
+        # them concurrently; entries are collected and deduplicated below
+        with ThreadPoolExecutor(max_workers=RSS_FETCH_WORKERS) as executor:
+            parsed_feeds = list(executor.map(_parse_feed, feed_docs))
+
+        # Collect entries across all feeds, keeping only the first occurrence of
+        # each link; syndicated stories often appear in several feeds
+        rss_articles = []
+        seen_links = set()
+        # Fallback publish time for entries without one, formatted once per run
+        fetched_at = datetime.now(UTC).isoformat()
+        for feed_doc, parsed_feed in zip(feed_docs, parsed_feeds):
+            if parsed_feed is None:
+                continue
+
             feed_url = feed_doc.get("url")
             feed_id = feed_doc.get("id")
             feed_title = feed_doc.get("title", "Unknown Feed")
 
-            if not feed_url:
-                logger.warning("RSS feed document missing URL", feed_id=feed_id)
-                continue
-
-            logger.info("Parsing RSS feed", url=feed_url, feed_id=feed_id)
             try:
-                parsed_feed = feedparser.parse(feed_url)
-
                 for entry in parsed_feed.entries:
-                    if not hasattr(entry, 'link'):
+                    if not hasattr(entry, 'link') or entry.link in seen_links:
                         continue
+                    seen_links.add(entry.link)
 
                     # Create article directly from RSS metadata (no crawling needed)
-                    article_data = {
+                    rss_articles.append({
                         'title': entry.get('title', 'Untitled'),
                         'link': entry.link,
                         'summary': entry.get('summary', entry.get('description', '')),
-                        'published': entry.get('published', datetime.utcnow().isoformat()),
+                        'published': entry.get('published', fetched_at),
                         'tags': [tag.get('term', '') for tag in entry.get('tags', [])],
                         'source': 'rss',
                         'feed_id': feed_id,
                         'feed_name': feed_title,
                         'content': None  # RSS articles don't need full content initially
-                    }
-
-                    try:
-                        result = backend_client.create_article(article_data)
-                        if 'created successfully' in result.get('message', ''):
-                            rss_articles_created += 1
-                            logger.debug("Created article from RSS",
-                                       article_title=article_data['title'],
-                                       feed_name=feed_title)
-                    except Exception as e:
-                        logger.error("Failed to create article from RSS",
-                                   article_link=entry.link,
-                                   feed_id=feed_id,
-                                   error=str(e))
+                    })
 
             except Exception as e:
-                logger.error("Error parsing RSS feed", url=feed_url, error=str(e))
+                logger.error("Error processing RSS feed entries", url=feed_url, error=str(e))
+
+        # Most entries were stored on a previous run; look them up in one query
+        # and only POST the ones the backend hasn't seen yet
+        existing_rss_links = {
+            article["link"]
+            for article in articles_collection.find({"link": {"$in": list(seen_links)}}, {"link": 1})
+        } if seen_links else set()
+        logger.info("Collected RSS entries",
+                   unique_count=len(rss_articles),
+                   existing_count=len(existing_rss_links))
+
+        new_rss_articles = [
+            article_data for article_data in rss_articles
+            if article_data['link'] not in existing_rss_links
+        ]
+
+        # Upload in batches so a run costs one request per ARTICLE_BATCH_SIZE
+        # articles, with the batches posted side by side over the client's
+        # pooled keep-alive connections
+        article_batches = [
+            new_rss_articles[i:i + ARTICLE_BATCH_SIZE]
+            for i in range(0, len(new_rss_articles), ARTICLE_BATCH_SIZE)
+        ]
+        with ThreadPoolExecutor(max_workers=ARTICLE_CREATE_WORKERS) as executor:
+            rss_articles_created = sum(executor.map(
+                lambda articles: _create_rss_articles(backend_client, articles),
+                article_batches,
+            ))
 
         logger.info("Created articles from RSS feeds", count=rss_articles_created)
 
@@ -102,22 +226,21 @@ def find_new_articles() -> list[str]:
                 os.environ["GOOGLE_API_KEY"] = google_api_key
                 os.environ["GOOGLE_CSE_ID"] = google_cse_id
 
+                # langchain_community is slow to import, so only load it when a
+                # search will actually run rather than at function app start-up
+                from langchain_community.utilities import GoogleSearchAPIWrapper
+
                 search = GoogleSearchAPIWrapper()
 
-                for topic in all_topics:
-                    logger.info("Searching for articles via Google Search", topic=topic)
-                    try:
-                        search_results = search.results(f"latest articles about {topic}", num_results=5)
-                        for res in search_results:
-                            if "link" in res:
-                                all_found_urls.add(res["link"])
-                    except Exception as e:
-                        logger.error("Error during Google Search for topic", topic=topic, error=str(e))
+                # Each topic is an independent HTTP request, so run them side by side
+                with ThreadPoolExecutor(max_workers=SEARCH_WORKERS) as executor:
+                    for links in executor.map(lambda topic: _search_topic(search, topic), all_topics):
+                        all_found_urls.update(links)
 
                 logger.info("Found URLs from Google Search (for crawling)", count=len(all_found_urls))
 
         # --- 4. Deduplicate Google Search URLs against existing articles ---
-        # (RSS articles were already deduplicated via create_article API)
+        # (RSS articles were already deduplicated above)
         if not all_found_urls:
             logger.info("No Google Search URLs to crawl. RSS articles created directly.")
             return []
@@ -0,0 +1,40 @@
+"""
+Token-bucket rate limiting for calls against quota-limited services.
+"""
+
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Holds up to ``capacity`` tokens, refilled continuously at ``rate`` tokens per
+    second. Each call spends tokens through ``acquire``, which blocks until they
+    are available, so bursts up to ``capacity`` go straight through and sustained
+    traffic is smoothed to ``rate``.
+    """
+
+    __slots__ = ("capacity", "rate", "_tokens", "_last", "_lock")
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self._tokens = capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1) -> None:
+        """Take ``tokens`` from the bucket, sleeping until they have refilled if needed."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            # Reserve the tokens up front, letting the balance go negative, so
+            # callers queue in order and the lock isn't held while sleeping
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+
+        if wait:
+            time.sleep(wait)
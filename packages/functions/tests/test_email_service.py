@@ -0,0 +1,118 @@
+import os
+import smtplib
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+# Add the project root to sys.path to enable module imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from shared import email_service
+from shared.email_service import EmailMessage, SMTPProvider
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    """Patch smtplib.SMTP, returning the list of sessions opened so far."""
+    opened = []
+
+    def connect(host, port):
+        server = MagicMock()
+        opened.append(server)
+        return server
+
+    monkeypatch.setattr(email_service.smtplib, "SMTP", connect)
+    return opened
+
+
+@pytest.fixture
+def provider():
+    return SMTPProvider(
+        smtp_host="smtp.example.com",
+        smtp_port=587,
+        smtp_username="sender@example.com",
+        smtp_password="secret",
+        rate_limiter=MagicMock()
+    )
+
+
+def make_messages(count):
+    return [
+        EmailMessage(to=f"user{i}@example.com", subject=f"Newsletter {i}", html_body="<p>Hi</p>")
+        for i in range(count)
+    ]
+
+
+def sent_to(server):
+    return [c.kwargs['to_addrs'][0] for c in server.send_message.call_args_list]
+
+
+def test_send_batch_logs_in_once(provider, connections):
+    results = list(provider.send_batch(make_messages(3)))
+
+    assert results == [True, True, True]
+    assert len(connections) == 1
+    server = connections[0]
+    server.starttls.assert_called_once()
+    server.login.assert_called_once_with("sender@example.com", "secret")
+    assert sent_to(server) == ["user0@example.com", "user1@example.com", "user2@example.com"]
+    server.quit.assert_called_once()
+    assert provider.rate_limiter.acquire.call_count == 3
+
+
+def test_send_batch_opens_no_connection_for_empty_batch(provider, connections):
+    assert list(provider.send_batch([])) == []
+    assert connections == []
+
+
+def test_send_batch_reconnects_once_after_disconnect(provider, connections, monkeypatch):
+    connect = email_service.smtplib.SMTP
+
+    def connect_first_session_drops(host, port):
+        server = connect(host, port)
+        if len(connections) == 1:
+            def send_message(msg, from_addr, to_addrs):
+                if to_addrs == ["user1@example.com"]:
+                    raise smtplib.SMTPServerDisconnected()
+
+            server.send_message.side_effect = send_message
+        return server
+
+    monkeypatch.setattr(email_service.smtplib, "SMTP", connect_first_session_drops)
+
+    results = list(provider.send_batch(make_messages(3)))
+
+    assert results == [True, True, True]
+    assert len(connections) == 2
+    first, second = connections
+    assert sent_to(first) == ["user0@example.com", "user1@example.com"]
+    # The dropped message is retried on the new session, which carries on the batch
+    assert sent_to(second) == ["user1@example.com", "user2@example.com"]
+    second.login.assert_called_once()
+    second.quit.assert_called_once()
+
+
+def test_send_batch_fails_message_when_retry_disconnects(provider, connections, monkeypatch):
+    connect = email_service.smtplib.SMTP
+
+    def connect_dropping_user1(host, port):
+        server = connect(host, port)
+
+        def send_message(msg, from_addr, to_addrs):
+            if to_addrs == ["user1@example.com"]:
+                raise smtplib.SMTPServerDisconnected()
+
+        server.send_message.side_effect = send_message
+        return server
+
+    monkeypatch.setattr(email_service.smtplib, "SMTP", connect_dropping_user1)
+
+    results = list(provider.send_batch(make_messages(3)))
+
+    # Only the message that failed after the reconnect is lost, and results keep input order
+    assert results == [True, False, True]
+    assert len(connections) == 2
+    assert sent_to(connections[0]) == ["user0@example.com", "user1@example.com"]
+    assert sent_to(connections[1]) == ["user1@example.com", "user2@example.com"]
+
@@ -0,0 +1,126 @@
+import os
+import sys
+from datetime import UTC, datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+# Add the project root to sys.path to enable module imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from shared import embeddings_service
+from shared.embeddings_service import EmbeddingsService
+
+
+def fake_embed_content(model, content, task_type):
+    # A distinct, recognizable vector per text
+    return {'embedding': [[float(len(text)), 1.0] for text in content]}
+
+
+@pytest.fixture
+def service():
+    embeddings_service._embedding_cache.clear()
+    svc = EmbeddingsService(api_key="test-key")
+    svc._genai = MagicMock()
+    svc._genai.embed_content.side_effect = fake_embed_content
+    yield svc
+    embeddings_service._embedding_cache.clear()
+
+
+def test_duplicate_texts_are_embedded_once(service):
+    embeddings = service.generate_embeddings_batch(["ai", "space", "ai", "", "space"])
+
+    service._genai.embed_content.assert_called_once()
+    assert service._genai.embed_content.call_args.kwargs['content'] == ["ai", "space"]
+    assert embeddings == [[2.0, 1.0], [5.0, 1.0], [2.0, 1.0], None, [5.0, 1.0]]
+
+
+def test_cached_texts_skip_the_api(service):
+    service.generate_embeddings_batch(["ai", "space"])
+    service._genai.embed_content.reset_mock()
+
+    embeddings = service.generate_embeddings_batch(["space", "robots"])
+
+    assert service._genai.embed_content.call_args.kwargs['content'] == ["robots"]
+    assert embeddings == [[5.0, 1.0], [6.0, 1.0]]
+    assert service.cache_hits == 1
+
+    service._genai.embed_content.reset_mock()
+    assert service.generate_embedding("ai") == [2.0, 1.0]
+    service._genai.embed_content.assert_not_called()
+
+
+def test_failed_batch_keeps_completed_batches(service, monkeypatch):
+    monkeypatch.setattr(embeddings_service, "EMBEDDING_BATCH_SIZE", 2)
+    calls = []
+
+    def embed_content(model, content, task_type):
+        calls.append(content)
+        if len(calls) == 2:
+            raise RuntimeError("quota exceeded")
+        return fake_embed_content(model, content, task_type)
+
+    service._genai.embed_content.side_effect = embed_content
+
+    embeddings = service.generate_embeddings_batch(["a", "bb", "ccc", "dddd", "eeeee"])
+
+    # The first batch succeeded, the second failed and the rest were not sent
+    assert calls == [["a", "bb"], ["ccc", "dddd"]]
+    assert embeddings == [[1.0, 1.0], [2.0, 1.0], None, None, None]
+
+    # The completed batch was cached, so only the failed texts are retried
+    service._genai.embed_content.side_effect = fake_embed_content
+    service._genai.embed_content.reset_mock()
+    embeddings = service.generate_embeddings_batch(["a", "bb", "ccc"])
+    assert service._genai.embed_content.call_args.kwargs['content'] == ["ccc"]
+    assert embeddings == [[1.0, 1.0], [2.0, 1.0], [3.0, 1.0]]
+
+
+def rank_with_pairwise_loop(service, articles, topic_embeddings, article_embeddings, now, recency_weight=0.3):
+    """The per-article, per-topic cosine_similarity loop the matrix ranking replaced."""
+    scored = []
+    for article in articles:
+        embedding = article_embeddings[article['id']]
+        max_similarity = max(
+            max(service.cosine_similarity(embedding, topic), 0.0) for topic in topic_embeddings
+        )
+        recency = service._recency_score(article.get('created_at'), now)
+        scored.append((article, (1 - recency_weight) * max_similarity + recency_weight * recency))
+    scored.sort(key=lambda pair: pair[1], reverse=True)
+    return scored
+
+
+def test_rank_articles_by_topics(service):
+    now = datetime.now(UTC)
+    articles = [
+        # Opposite to every topic: the similarity is clamped to 0, leaving only recency
+        {'id': 'opposite', 'created_at': now.replace(tzinfo=None)},
+        {'id': 'match', 'created_at': now - timedelta(hours=84)},
+        # Tied with 'tie-b' and listed first, so it must stay first
+        {'id': 'tie-a', 'created_at': (now - timedelta(hours=24)).isoformat()},
+        {'id': 'tie-b', 'created_at': (now - timedelta(hours=24)).replace(tzinfo=None)},
+        {'id': 'undated'},
+    ]
+    article_embeddings = {
+        'opposite': [-1.0, -1.0, 0.0],
+        'match': [2.0, 0.0, 0.0],
+        'tie-a': [0.0, 3.0, 4.0],
+        'tie-b': [0.0, 0.6, 0.8],
+        'undated': [1.0, 1.0, 0.0],
+    }
+    topic_embeddings = [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]]
+
+    ranked = service.rank_articles_by_topics(
+        articles, topic_embeddings, article_embeddings=article_embeddings
+    )
+
+    scores = {article['id']: score for article, score in ranked}
+    assert scores['opposite'] == pytest.approx(0.3, abs=1e-4)
+    assert scores['match'] == pytest.approx(0.7 + 0.3 * 0.5, abs=1e-4)
+    assert scores['tie-a'] == scores['tie-b']
+    assert scores['undated'] == pytest.approx(0.7 * 2 ** -0.5 + 0.3 * 0.5, abs=1e-4)
+
+    expected = rank_with_pairwise_loop(service, articles, topic_embeddings, article_embeddings, now)
+    assert [a['id'] for a, _ in ranked] == [a['id'] for a, _ in expected]
+    assert [score for _, score in ranked] == pytest.approx([score for _, score in expected], abs=1e-4)
+    service._genai.embed_content.assert_not_called()
@@ -0,0 +1,83 @@
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue
+from unittest.mock import MagicMock
+
+# Add the project root to sys.path to enable module imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from NewsletterGenerator import _collect_delivery_counts, _delivery_worker
+from shared.email_service import EmailMessage
+
+
+class FakeProvider:
+    """Yields the scripted send results in order, raising once they run out."""
+
+    def __init__(self, results, error=None):
+        self.results = results
+        self.error = error
+        self.sent_to = []
+
+    def send_batch(self, messages):
+        results = iter(self.results)
+        for message in messages:
+            result = next(results, None)
+            if result is None:
+                raise self.error
+            self.sent_to.append(message.to)
+            yield result
+
+
+def queue_newsletters(user_ids):
+    newsletters = Queue()
+    for user_id in user_ids:
+        message = EmailMessage(to=f"{user_id}@example.com", subject="Digest", html_body="<p>Hi</p>")
+        newsletters.put((user_id, message, [{'id': f"{user_id}-article"}]))
+    newsletters.put(None)
+    return newsletters
+
+
+def recorded_users(collection):
+    return [
+        call.args[0][0]._filter['user_id']
+        for call in collection.bulk_write.call_args_list
+    ]
+
+
+def test_delivery_worker_records_only_sent_newsletters():
+    collection = MagicMock()
+    provider = FakeProvider([True, False, True])
+
+    counts = _delivery_worker(provider, collection, queue_newsletters(["u1", "u2", "u3"]))
+
+    assert counts == (2, 1)
+    assert recorded_users(collection) == ["u1", "u3"]
+    assert collection.bulk_write.call_args.kwargs == {'ordered': False}
+
+
+def test_failed_worker_keeps_other_workers_counts():
+    healthy_collection = MagicMock()
+    failing_collection = MagicMock()
+    healthy = FakeProvider([True, False])
+    failing = FakeProvider([True], error=ConnectionError("relay went away"))
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        workers = [
+            executor.submit(_delivery_worker, healthy, healthy_collection, queue_newsletters(["u1", "u2"])),
+            executor.submit(_delivery_worker, failing, failing_collection, queue_newsletters(["u3", "u4"])),
+        ]
+
+    assert _collect_delivery_counts(workers) == (1, 1)
+    # Newsletters sent before a worker failed are still tracked
+    assert recorded_users(healthy_collection) == ["u1"]
+    assert recorded_users(failing_collection) == ["u3"]
+    assert failing.sent_to == ["u3@example.com"]
+
+
+def test_collect_delivery_counts_sums_workers():
+    workers = [MagicMock(), MagicMock()]
+    workers[0].result.return_value = (3, 1)
+    workers[1].result.return_value = (2, 0)
+
+    assert _collect_delivery_counts(workers) == (5, 1)
@@ -0,0 +1,125 @@
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import google
+import pytest
+
+# Add the project root to sys.path to enable module imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import NewsletterGeneratorManual
+
+ARTICLES = [
+    {'_id': 1, 'title': 'AI news', 'summary': 'ai things', 'created_at': '3'},
+    {'_id': 2, 'title': 'Space', 'summary': 'rockets', 'created_at': '2'},
+    {'_id': 3, 'title': 'Robots', 'summary': None, 'created_at': '1'},
+]
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    """Run main against mocked Key Vault, Mongo, Gemini and SMTP."""
+    for name, value in {
+        'BREVO_SMTP_USER': 'sender', 'BREVO_SMTP_HOST': 'smtp.example.com',
+        'BREVO_SMTP_PORT': '587', 'SENDER_EMAIL': 'news@example.com'
+    }.items():
+        monkeypatch.setenv(name, value)
+
+    NewsletterGeneratorManual._newsletter_cache.clear()
+    monkeypatch.setattr(NewsletterGeneratorManual, '_gemini_rate_limiter', MagicMock())
+    monkeypatch.setattr(NewsletterGeneratorManual, 'get_secret_client', MagicMock())
+
+    prompts = []
+
+    def generate_content(prompt):
+        prompts.append(prompt)
+        if 'Robots' in prompt:
+            raise RuntimeError("quota exceeded")
+        if 'AI news' in prompt:
+            # Finish after later users' newsletters to show sends keep input order
+            time.sleep(0.1)
+        return MagicMock(text=f"# Digest\n\n{prompt.splitlines()[2]}")
+
+    model = MagicMock()
+    model.generate_content.side_effect = generate_content
+    genai = MagicMock()
+    genai.GenerativeModel.return_value = model
+    monkeypatch.setitem(sys.modules, 'google.generativeai', genai)
+    monkeypatch.setattr(google, 'generativeai', genai, raising=False)
+
+    sent = []
+
+    def send_batch(messages):
+        for message in messages:
+            sent.append(message)
+            yield True
+
+    smtp_provider = MagicMock()
+    smtp_provider.send_batch.side_effect = send_batch
+    monkeypatch.setattr(NewsletterGeneratorManual, 'SMTPProvider', MagicMock(return_value=smtp_provider))
+
+    db = MagicMock()
+    monkeypatch.setattr(NewsletterGeneratorManual, 'get_mongo_client', MagicMock(return_value=MagicMock(up2d8=db)))
+
+    def run(users):
+        db.users.find.return_value = users
+        db.articles.find.return_value = ARTICLES
+        request = MagicMock(params={})
+        response = NewsletterGeneratorManual.main(request)
+        return json.loads(response.get_body())
+
+    run.prompts = prompts
+    run.sent = sent
+    return run
+
+
+def user(email, topic):
+    return {'email': email, 'topics': [topic], 'preferences': {}}
+
+
+def test_parallel_generation(pipeline):
+    result = pipeline([
+        user('u0@example.com', 'ai'),
+        user('u1@example.com', 'robots'),
+        user('u2@example.com', 'space'),
+        user('u3@example.com', 'ai'),
+    ])
+
+    # u0 and u3 send the same prompt, so it is generated once for both
+    assert len(pipeline.prompts) == 3
+    assert sum('AI news' in prompt for prompt in pipeline.prompts) == 1
+
+    # The failed generation is reported without stopping the batch, and the rest
+    # go out in input order even though the AI newsletter finished last
+    assert [message.to for message in pipeline.sent] == [
+        'u0@example.com', 'u2@example.com', 'u3@example.com'
+    ]
+    assert pipeline.sent[0].html_body == pipeline.sent[2].html_body
+    assert result['newsletters_sent'] == 3
+    assert result['details']['errors'] == [
+        {'email': 'u1@example.com', 'error': 'Gemini API error: quota exceeded'}
+    ]
+
+
+def test_generated_newsletters_are_cached_across_runs(pipeline):
+    pipeline([user('u0@example.com', 'space')])
+    result = pipeline([user('u1@example.com', 'space')])
+
+    assert len(pipeline.prompts) == 1
+    assert [message.to for message in pipeline.sent] == ['u0@example.com', 'u1@example.com']
+    assert result['newsletters_sent'] == 1
+
+
+def test_markdown_conversion_is_thread_safe():
+    documents = [f"# Digest {i}\n\n- item {i}\n" for i in range(200)]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        html = list(executor.map(NewsletterGeneratorManual._markdown_to_html, documents))
+
+    assert html == [
+        f"<h1>Digest {i}</h1>\n<ul>\n<li>item {i}</li>\n</ul>" for i in range(200)
+    ]
@@ -0,0 +1,97 @@
+import os
+import sys
+
+import pytest
+
+# Add the project root to sys.path to enable module imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from shared import rate_limiter
+from shared.rate_limiter import TokenBucket
+
+
+class FakeClock:
+    """Stands in for time.monotonic/time.sleep; sleeping advances the clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+        self.bucket = None
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        # The bucket must never be locked while a caller waits
+        assert not self.bucket._lock.locked()
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", fake.monotonic)
+    monkeypatch.setattr(rate_limiter.time, "sleep", fake.sleep)
+    return fake
+
+
+def make_bucket(clock, capacity, rate):
+    clock.bucket = TokenBucket(capacity=capacity, rate=rate)
+    return clock.bucket
+
+
+def test_burst_up_to_capacity_does_not_wait(clock):
+    bucket = make_bucket(clock, capacity=3, rate=1)
+
+    for _ in range(3):
+        bucket.acquire()
+
+    assert clock.sleeps == []
+    assert bucket._tokens == 0
+
+
+def test_balance_goes_negative_and_callers_queue(clock, monkeypatch):
+    bucket = make_bucket(clock, capacity=2, rate=4)
+    bucket.acquire(2)
+
+    # Without time passing, each caller reserves its token and waits for the
+    # balance to refill past its reservation, so waits grow in arrival order
+    monkeypatch.setattr(rate_limiter.time, "sleep", clock.sleeps.append)
+    bucket.acquire()
+    bucket.acquire()
+    bucket.acquire()
+
+    assert bucket._tokens == -3
+    assert clock.sleeps == pytest.approx([0.25, 0.5, 0.75])
+
+
+def test_sleeps_outside_the_lock(clock):
+    bucket = make_bucket(clock, capacity=1, rate=2)
+    bucket.acquire()
+    bucket.acquire()
+
+    # FakeClock.sleep asserts the lock is free
+    assert clock.sleeps == pytest.approx([0.5])
+
+
+def test_refill_is_capped_at_capacity(clock):
+    bucket = make_bucket(clock, capacity=2, rate=10)
+    bucket.acquire(2)
+
+    clock.now += 60
+    bucket.acquire()
+
+    assert bucket._tokens == pytest.approx(1)
+
+
+def test_steady_state_rate(clock):
+    bucket = make_bucket(clock, capacity=5, rate=10)
+    start = clock.now
+
+    for _ in range(105):
+        bucket.acquire()
+
+    # The first 5 are the burst; the remaining 100 are paced at 10 per second
+    assert clock.now - start == pytest.approx(10.0)
+    assert clock.sleeps == pytest.approx([0.1] * 100)